@@ -31,7 +31,10 @@ import math
 import json
 import re
 import argparse
-from dataclasses import dataclass
+import hashlib
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from enum import Enum
 from typing import List, Tuple, Optional, Any, Dict, Iterable
 from functools import lru_cache
@@ -74,6 +77,22 @@ def simple_token_count(text: str) -> int:
 def clamp(x, a, b):
     return a if x < a else b if x > b else x
 
+def line_start_offsets(content: str) -> List[int]:
+    """
+    Build the character offsets where each line starts, plus a final sentinel
+    equal to len(content). Line k spans content[offsets[k]:offsets[k+1]], the
+    number of lines is len(offsets) - 1, and the prefix ending before line k
+    is exactly offsets[k] characters — all without materializing line strings.
+    """
+    offsets = [0]
+    i = content.find('\n')
+    while i != -1:
+        offsets.append(i + 1)
+        i = content.find('\n', i + 1)
+    if offsets[-1] != len(content):
+        offsets.append(len(content))
+    return offsets
+
 # ---------- Smart splitter ----------
 class SmartJavaSplitterV2:
     """
@@ -81,6 +100,31 @@ class SmartJavaSplitterV2:
       - parser: Tree-sitter Parser if available
       - config: scoring weights and thresholds
     """
+    # Node types that never contain useful split candidates below them;
+    # pruning these subtrees keeps the AST traversal close to the number
+    # of declaration/statement nodes instead of every token.
+    _LEAF_TYPES = frozenset({
+        'binary_expression',
+        'unary_expression',
+        'update_expression',
+        'ternary_expression',
+        'method_invocation',
+        'object_creation_expression',
+        'field_access',
+        'array_access',
+        'argument_list',
+        'identifier',
+        'decimal_integer_literal',
+        'decimal_floating_point_literal',
+        'string_literal',
+        'character_literal',
+        'true',
+        'false',
+        'null_literal',
+        'line_comment',
+        'block_comment',
+    })
+
     DEFAULT_WEIGHTS = {
         'class': 10.0,
         'method': 8.0,
@@ -126,6 +170,19 @@ class SmartJavaSplitterV2:
 
         self.semantic_weights = SmartJavaSplitterV2.DEFAULT_WEIGHTS
 
+        # LRU cache of extracted candidate lists keyed by content hash; pays off
+        # in recursive mode (repeated prefix/suffix substrings) and on duplicated
+        # boilerplate files during batch processing
+        self._cand_cache: OrderedDict = OrderedDict()
+        self._cand_cache_max = 512
+
+        # cache loop-invariant scoring constants (recompute if weights/params change)
+        self._max_sem_weight = max(self.semantic_weights.values())
+        self._score_denom = (self.scoring_params['alpha_semantic'] +
+                             self.scoring_params['beta_balance'] +
+                             self.scoring_params['gamma_density'] +
+                             self.scoring_params['delta_depth'])
+
     # ----------------- Public API -----------------
     def split_file(self, source: str, mode: str = 'best', recursive: bool = False) -> Optional[List[SplitResult]]:
         """
@@ -133,27 +190,27 @@ class SmartJavaSplitterV2:
         mode: 'best' -> return best single split; 'candidates' -> return scored candidates list
         recursive: if True, perform multi-granularity recursive splits (returns list of results)
         """
-        lines = source.splitlines(keepends=True)
-        if len(lines) < 3:
-            return None
-
         content = source
+        line_offsets = line_start_offsets(content)
+        n_lines = len(line_offsets) - 1
+        if n_lines < 3:
+            return None
 
         # parse and get candidates
         if self.use_tree_sitter and self.parser:
             try:
                 tree = self.parser.parse(bytes(content, 'utf8'))
                 root = tree.root_node
-                candidates = self._candidates_from_ast(root, content, lines)
+                candidates = self._candidates_from_ast(root, content, line_offsets)
             except Exception as e:
                 # fallback to regex-based
-                candidates = self._candidates_from_fallback(content, lines)
+                candidates = self._candidates_from_fallback(content, line_offsets)
         else:
-            candidates = self._candidates_from_fallback(content, lines)
+            candidates = self._candidates_from_fallback(content, line_offsets)
 
         if not candidates:
             # add balanced mid point
-            mid = len(lines) // 2
+            mid = n_lines // 2
             candidates = [Candidate(line_index=mid,
                                     node_type='balanced',
                                     semantic_weight=self.semantic_weights['balanced'],
@@ -163,13 +220,13 @@ class SmartJavaSplitterV2:
                                     is_semantic_boundary=False)]
 
         # score candidates
-        self._score_candidates(candidates, content, lines)
+        self._score_candidates(candidates, content, line_offsets)
 
         # filter valid splits
-        valid = [c for c in candidates if self._is_valid_split_candidate(c, content, lines)]
+        valid = [c for c in candidates if self._is_valid_split_candidate(c, content, line_offsets)]
         if not valid:
             # attempt relaxing thresholds by allowing shorter suffix/prefix
-            valid = [c for c in candidates if self._is_valid_split_candidate(c, content, lines, relax=True)]
+            valid = [c for c in candidates if self._is_valid_split_candidate(c, content, line_offsets, relax=True)]
 
         if not valid:
             return None
@@ -180,21 +237,22 @@ class SmartJavaSplitterV2:
         results = []
         if mode == 'candidates':
             for c in valid:
-                prefix = ''.join(lines[:c.line_index])
-                suffix = ''.join(lines[c.line_index:])
-                results.append(SplitResult(prefix=prefix, suffix=suffix, split_line=c.line_index, candidate=c))
+                cut = line_offsets[c.line_index]
+                results.append(SplitResult(prefix=content[:cut], suffix=content[cut:], split_line=c.line_index, candidate=c))
             return results
 
         # mode == 'best'
         best = valid[0]
-        prefix = ''.join(lines[:best.line_index])
-        suffix = ''.join(lines[best.line_index:])
+        cut = line_offsets[best.line_index]
+        prefix = content[:cut]
+        suffix = content[cut:]
 
         if not self._validate_split_result(prefix, suffix):
             # try next best
             for c in valid[1:]:
-                p = ''.join(lines[:c.line_index])
-                s = ''.join(lines[c.line_index:])
+                cut = line_offsets[c.line_index]
+                p = content[:cut]
+                s = content[cut:]
                 if self._validate_split_result(p, s):
                     best = c
                     prefix, suffix = p, s
@@ -243,12 +301,32 @@ class SmartJavaSplitterV2:
         return results
 
     # ----------------- Internals: Candidate extraction -----------------
-    def _candidates_from_ast(self, root_node, content: str, lines: List[str]) -> List[Candidate]:
+    def _cand_cache_get(self, kind: str, content: str):
+        """Look up a cached candidate list; returns (key, hit-or-None)."""
+        key = (kind, hashlib.blake2b(content.encode('utf8'), digest_size=16).digest())
+        cached = self._cand_cache.get(key)
+        if cached is not None:
+            self._cand_cache.move_to_end(key)
+            # copy so callers can mutate .score without polluting the cache
+            return key, [replace(c) for c in cached]
+        return key, None
+
+    def _cand_cache_put(self, key, candidates: List[Candidate]):
+        self._cand_cache[key] = [replace(c) for c in candidates]
+        if len(self._cand_cache) > self._cand_cache_max:
+            self._cand_cache.popitem(last=False)
+
+    def _candidates_from_ast(self, root_node, content: str, line_offsets: List[int]) -> List[Candidate]:
         """
         Traverse the AST and produce split candidates.
         Uses node types from tree-sitter-java grammar.
         """
+        cache_key, cached = self._cand_cache_get('ast', content)
+        if cached is not None:
+            return cached
+
         candidates: List[Candidate] = []
+        n_lines = len(line_offsets) - 1
 
         def traverse(node, depth=0):
             # ignore anonymous class bodies and comments
@@ -260,7 +338,7 @@ class SmartJavaSplitterV2:
             start_line = node.start_point[0]  # 0-based
             # map node types to semantic categories
             if node_type in ('class_declaration', 'normal_interface_declaration', 'enum_declaration', 'record_declaration'):
-                candidates.append(Candidate(line_index=self._line_after_node(node, lines),
+                candidates.append(Candidate(line_index=self._line_after_node(node, n_lines),
                                             node_type=node_type,
                                             semantic_weight=self.semantic_weights.get('class', 10.0),
                                             depth=depth,
@@ -268,7 +346,7 @@ class SmartJavaSplitterV2:
                                             description=f'After {node_type}',
                                             is_semantic_boundary=True))
             elif node_type in ('method_declaration',):
-                candidates.append(Candidate(line_index=self._line_after_node(node, lines),
+                candidates.append(Candidate(line_index=self._line_after_node(node, n_lines),
                                             node_type=node_type,
                                             semantic_weight=self.semantic_weights.get('method', 8.0),
                                             depth=depth,
@@ -276,7 +354,7 @@ class SmartJavaSplitterV2:
                                             description='After method',
                                             is_semantic_boundary=True))
             elif node_type in ('constructor_declaration',):
-                candidates.append(Candidate(line_index=self._line_after_node(node, lines),
+                candidates.append(Candidate(line_index=self._line_after_node(node, n_lines),
                                             node_type=node_type,
                                             semantic_weight=self.semantic_weights.get('constructor', 7.0),
                                             depth=depth,
@@ -284,7 +362,7 @@ class SmartJavaSplitterV2:
                                             description='After constructor',
                                             is_semantic_boundary=True))
             elif node_type in ('field_declaration',):
-                candidates.append(Candidate(line_index=self._line_after_node(node, lines),
+                candidates.append(Candidate(line_index=self._line_after_node(node, n_lines),
                                             node_type=node_type,
                                             semantic_weight=self.semantic_weights.get('field', 4.0),
                                             depth=depth,
@@ -292,7 +370,7 @@ class SmartJavaSplitterV2:
                                             description='After field',
                                             is_semantic_boundary=False))
             elif node_type.endswith('_statement') or node_type in ('if_statement', 'for_statement', 'while_statement', 'try_statement', 'switch_expression', 'switch_statement'):
-                candidates.append(Candidate(line_index=self._line_after_node(node, lines),
+                candidates.append(Candidate(line_index=self._line_after_node(node, n_lines),
                                             node_type=node_type,
                                             semantic_weight=self.semantic_weights.get('control', 3.5),
                                             depth=depth,
@@ -300,13 +378,16 @@ class SmartJavaSplitterV2:
                                             description=f'After {node_type}',
                                             is_semantic_boundary=False))
             elif node_type in ('expression_statement',):
-                candidates.append(Candidate(line_index=self._line_after_node(node, lines),
+                candidates.append(Candidate(line_index=self._line_after_node(node, n_lines),
                                             node_type=node_type,
                                             semantic_weight=self.semantic_weights.get('statement', 2.0),
                                             depth=depth,
                                             token_density=self._token_density_around(node, content),
                                             description='After expression stmt',
                                             is_semantic_boundary=False))
+            # prune: leaf-class subtrees never yield candidates
+            if node_type in SmartJavaSplitterV2._LEAF_TYPES:
+                return
             # recurse children
             for c in node.children:
                 traverse(c, depth + 1)
@@ -315,7 +396,7 @@ class SmartJavaSplitterV2:
 
         # if no semantic splits, include balanced mid
         if not candidates:
-            mid = len(lines) // 2
+            mid = n_lines // 2
             candidates.append(Candidate(line_index=mid,
                                         node_type='balanced',
                                         semantic_weight=self.semantic_weights.get('balanced', 1.0),
@@ -323,19 +404,25 @@ class SmartJavaSplitterV2:
                                         token_density=0.0,
                                         description='balanced default',
                                         is_semantic_boundary=False))
+        self._cand_cache_put(cache_key, candidates)
         return candidates
 
-    def _candidates_from_fallback(self, content: str, lines: List[str]) -> List[Candidate]:
+    def _candidates_from_fallback(self, content: str, line_offsets: List[int]) -> List[Candidate]:
         """
         More robust fallback using regex but improved:
         - find class/method/constructor/field patterns, but then compute an approximate line
         """
+        cache_key, cached = self._cand_cache_get('fallback', content)
+        if cached is not None:
+            return cached
+
         candidates: List[Candidate] = []
+        n_lines = len(line_offsets) - 1
         # class
         class_pat = re.compile(r'(?:public|protected|private)?\s*(?:abstract|final|sealed|static)?\s*(class|interface|enum|record|@interface)\s+\w+', re.M)
         for m in class_pat.finditer(content):
-            ln = content[:m.end()].count('\n')
-            candidates.append(Candidate(line_index=min(ln + 1, len(lines)-1),
+            ln = bisect_right(line_offsets, m.end()) - 1
+            candidates.append(Candidate(line_index=min(ln + 1, n_lines - 1),
                                         node_type='class_declaration',
                                         semantic_weight=self.semantic_weights.get('class', 10.0),
                                         depth=1,
@@ -345,8 +432,8 @@ class SmartJavaSplitterV2:
         # method
         method_pat = re.compile(r'(?:public|protected|private)?\s*(?:static|final|synchronized|native|strictfp|default)?\s*(?:<[^>]*>)?\s*(?:[\w\[\]\<\>]+)\s+(\w+)\s*\([^;{)]*\)\s*(?:throws\s+[^{;]+)?\s*[{;]', re.M)
         for m in method_pat.finditer(content):
-            ln = content[:m.end()].count('\n')
-            candidates.append(Candidate(line_index=min(ln + 1, len(lines)-1),
+            ln = bisect_right(line_offsets, m.end()) - 1
+            candidates.append(Candidate(line_index=min(ln + 1, n_lines - 1),
                                         node_type='method_declaration',
                                         semantic_weight=self.semantic_weights.get('method', 8.0),
                                         depth=1,
@@ -356,8 +443,8 @@ class SmartJavaSplitterV2:
         # constructors
         ctor_pat = re.compile(r'(?:public|protected|private)?\s*([A-Z]\w*)\s*\([^)]*\)\s*(?:throws\s+[^{;]+)?\s*[{;]', re.M)
         for m in ctor_pat.finditer(content):
-            ln = content[:m.end()].count('\n')
-            candidates.append(Candidate(line_index=min(ln + 1, len(lines)-1),
+            ln = bisect_right(line_offsets, m.end()) - 1
+            candidates.append(Candidate(line_index=min(ln + 1, n_lines - 1),
                                         node_type='constructor_declaration',
                                         semantic_weight=self.semantic_weights.get('constructor', 7.0),
                                         depth=1,
@@ -367,7 +454,7 @@ class SmartJavaSplitterV2:
 
         # add balanced if none
         if not candidates:
-            mid = len(lines) // 2
+            mid = n_lines // 2
             candidates.append(Candidate(line_index=mid,
                                         node_type='balanced',
                                         semantic_weight=self.semantic_weights.get('balanced', 1.0),
@@ -381,14 +468,16 @@ class SmartJavaSplitterV2:
             prev = by_line.get(c.line_index)
             if prev is None or c.semantic_weight > prev.semantic_weight:
                 by_line[c.line_index] = c
-        return list(by_line.values())
+        result = list(by_line.values())
+        self._cand_cache_put(cache_key, result)
+        return result
 
     # ----------------- Scoring -----------------
-    def _score_candidates(self, candidates: List[Candidate], content: str, lines: List[str]):
+    def _score_candidates(self, candidates: List[Candidate], content: str, line_offsets: List[int]):
         total_chars = len(content)
         for c in candidates:
             # balance score: how close split is to center (0..1), center->1
-            prefix_len = sum(len(l) for l in lines[:c.line_index])
+            prefix_len = line_offsets[c.line_index]
             prefix_ratio = prefix_len / max(1, total_chars)
             balance_score = 1.0 - abs(prefix_ratio - 0.5) * 2.0  # 1 if exactly center, 0 at extremes
             balance_score = clamp(balance_score, 0.0, 1.0)
@@ -403,32 +492,28 @@ class SmartJavaSplitterV2:
             depth_score = 1.0 / (1 + c.depth)  # deeper -> smaller
 
             # combine
-            s = (self.scoring_params['alpha_semantic'] * (c.semantic_weight / max(self.semantic_weights.values())) +
+            s = (self.scoring_params['alpha_semantic'] * (c.semantic_weight / self._max_sem_weight) +
                  self.scoring_params['beta_balance'] * balance_score +
                  self.scoring_params['gamma_density'] * td_score +
                  self.scoring_params['delta_depth'] * depth_score)
 
             # normalize final score to 0..1
-            # compute theoretical max = alpha*1 + beta*1 + gamma*1 + delta*1
-            denom = (self.scoring_params['alpha_semantic'] +
-                     self.scoring_params['beta_balance'] +
-                     self.scoring_params['gamma_density'] +
-                     self.scoring_params['delta_depth'])
-            c.score = s / max(denom, 1e-8)
+            # theoretical max (alpha*1 + beta*1 + gamma*1 + delta*1) is cached in __init__
+            c.score = s / max(self._score_denom, 1e-8)
 
     # ----------------- Helpers -----------------
-    def _line_after_node(self, node, lines: List[str]) -> int:
+    def _line_after_node(self, node, n_lines: int) -> int:
         """
         Compute the line index after node end, clamp to valid range.
         node.end_point gives (row, col) zero-based; we will take end row + 1
         """
         try:
             end_row = node.end_point[0]
-            idx = min(end_row + 1, len(lines) - 1)
+            idx = min(end_row + 1, n_lines - 1)
             # ensure we don't return 0
             return max(1, idx)
         except Exception:
-            return max(1, len(lines)//2)
+            return max(1, n_lines // 2)
 
     def _token_density_around(self, node, content: str, window_chars: int = 200) -> float:
         """
@@ -450,13 +535,13 @@ class SmartJavaSplitterV2:
         tokens = simple_token_count(snippet)
         return tokens / max(1, len(snippet))
 
-    def _is_valid_split_candidate(self, c: Candidate, content: str, lines: List[str], relax: bool = False) -> bool:
+    def _is_valid_split_candidate(self, c: Candidate, content: str, line_offsets: List[int], relax: bool = False) -> bool:
         """
         Validate candidate by length and ratio constraints.
         relax=True reduces min char constraints by half.
         """
         total = len(content)
-        prefix_chars = sum(len(l) for l in lines[:c.line_index])
+        prefix_chars = line_offsets[c.line_index]
         suffix_chars = total - prefix_chars
         min_pref = self.min_prefix_chars // (2 if relax else 1)
         min_suf = self.min_suffix_chars // (2 if relax else 1)
@@ -17,28 +17,290 @@ coupling_analyzer.py
 """
 
 import os
+import re
 import ast
+import csv
 import json
-import networkx as nx
-import matplotlib.pyplot as plt
-import seaborn as sns
+import pickle
+import hashlib
 import numpy as np
-import pandas as pd
 from pathlib import Path
 from typing import Dict, List, Tuple, Any
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _cohen_d(a: np.ndarray, b: np.ndarray) -> float:
+    """Cohen's d 效应量：均值差除以合并标准差"""
+    return float((a.mean() - b.mean()) / np.sqrt((a.var(ddof=1) + b.var(ddof=1)) / 2))
+
+
+def _load_pyplot():
+    """首次使用时才导入 matplotlib（冷启动省数百毫秒），并强制 Agg 后端"""
+    import matplotlib
+    matplotlib.use('Agg')  # 非交互后端：避免无头/CI 环境初始化 GUI
+    import matplotlib.pyplot as plt
+    return plt
+
+
+class _ModuleVisitor(ast.NodeVisitor):
+    """
+    单次遍历收集函数定义、导入目标和 (所在函数名, 被调用名) 对；
+    相比 ast.walk + isinstance 过滤，只对相关节点做 Python 级分发
+    """
+
+    def __init__(self):
+        self.current_function = None
+        self.funcs = []
+        self.imports = []
+        self.calls = []
+
+    def visit_FunctionDef(self, node):
+        self.funcs.append(node.name)
+        prev_func = self.current_function
+        self.current_function = node.name
+        self.generic_visit(node)
+        self.current_function = prev_func
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.imports.append(alias.name)
+
+    def visit_ImportFrom(self, node):
+        if node.module:
+            self.imports.append(node.module)
+
+    def visit_Call(self, node):
+        if self.current_function:
+            if isinstance(node.func, ast.Name):
+                callee = node.func.id
+            elif isinstance(node.func, ast.Attribute):
+                # 后续查表只用裸函数名做键，取尾部属性名即可，
+                # 避免 ast.unparse 对整个子树重建字符串
+                callee = node.func.attr
+            else:
+                callee = "unknown"
+            self.calls.append((self.current_function, callee))
+        self.generic_visit(node)
+
+
+def _weighted_coupling_scores(import_in, import_out, fan_in, fan_out):
+    """加权耦合度：0.2*导入入度 + 0.2*导入出度 + 0.3*调用入度 + 0.3*调用出度"""
+    return 0.2 * import_in + 0.2 * import_out + 0.3 * fan_in + 0.3 * fan_out
+
+
+if _HAS_NUMBA:
+    @njit(cache=True, parallel=True)
+    def _weighted_coupling_scores(import_in, import_out, fan_in, fan_out):  # noqa: F811
+        scores = np.empty(import_in.size)
+        for k in prange(import_in.size):
+            scores[k] = (0.2 * import_in[k] + 0.2 * import_out[k] +
+                         0.3 * fan_in[k] + 0.3 * fan_out[k])
+        return scores
+
+
+# 超过该大小的文件（通常为生成代码）直接跳过解析
+_MAX_PARSE_BYTES = 2_000_000
+
+# 字节级预扫描：无 def 的文件跳过 AST 解析，仅用正则提取导入目标
+_DEF_RE = re.compile(rb'^[ \t]*(?:async[ \t]+)?def[ \t]+', re.M)
+_IMPORT_ONLY_RE = re.compile(rb'^[ \t]*(?:from[ \t]+([\w.]+)[ \t]+import|import[ \t]+([\w.]+))', re.M)
+
+
+def _extract_python_structure(file_path: str) -> Tuple[List[str], List[str], List[Tuple[str, str]]]:
+    """解析单个 Python 文件，返回 (函数名列表, 导入目标列表, 调用对列表)"""
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        if len(data) > _MAX_PARSE_BYTES:
+            print(f"⚠️ 文件过大，跳过解析: {file_path}")
+            return [], [], []
+        if not _DEF_RE.search(data):
+            # __init__.py、配置模块等无函数文件：省掉整个 parse
+            imports = [(m.group(1) or m.group(2)).decode('utf-8', 'replace')
+                       for m in _IMPORT_ONLY_RE.finditer(data)]
+            return [], imports, []
+        content = data.decode('utf-8')
+        # optimize=2 让解析器直接丢弃 docstring，缩小待遍历的 AST
+        tree = compile(content, file_path, 'exec',
+                       flags=ast.PyCF_ONLY_AST, dont_inherit=True, optimize=2)
+    except SyntaxError:
+        print(f"⚠️ 语法错误，跳过文件: {file_path}")
+        return [], [], []
+    except Exception as e:
+        print(f"⚠️ 解析文件失败: {file_path} - {e}")
+        return [], [], []
+
+    visitor = _ModuleVisitor()
+    visitor.visit(tree)
+    return visitor.funcs, visitor.imports, visitor.calls
+
+
+# 扩展名 -> 结构提取器；新增语言时在此注册
+_LANGUAGE_EXTRACTORS = {
+    '.py': _extract_python_structure,
+}
+
+_SUPPORTED_EXTENSIONS = frozenset({'.py', '.java', '.js', '.ts', '.cpp', '.c', '.cs', '.go', '.rs'})
+
+# 遍历时整体剪掉的目录：版本库、虚拟环境、缓存、依赖目录
+_SKIP_DIRS = frozenset({'.git', '.hg', '.svn', '.venv', 'venv', 'env',
+                        '__pycache__', 'node_modules', '.tox', '.mypy_cache',
+                        '.pytest_cache', 'build', 'dist'})
+
+
+def _iter_source_files(root_dir: str):
+    """基于 os.scandir 的懒遍历：按需 yield 源文件路径并提前剪枝无关目录"""
+    stack = [root_dir]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIP_DIRS:
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        if os.path.splitext(entry.name)[1] in _SUPPORTED_EXTENSIONS:
+                            yield entry.path
+        except OSError:
+            continue
+
+
+def _parse_source_file(file_path: str, cache_dir: str = None) -> Tuple[str, List[str], List[str], List[Tuple[str, str]]]:
+    """
+    进程池 worker：读取并解析单个源文件，返回可直接合并的纯数据元组
+
+    cache_dir 不为 None 时按 (mtime_ns, size) 做磁盘缓存，
+    重复运行（如先显性后非显性项目、参数调整重跑）直接反序列化命中结果。
+
+    Returns:
+        (file_path, 函数名列表, 导入目标列表, [(调用方函数名, 被调用名)])
+    """
+    extractor = _LANGUAGE_EXTRACTORS.get(os.path.splitext(file_path)[1])
+    if extractor is None:
+        return file_path, [], [], []
+
+    cache_path = None
+    st = None
+    if cache_dir:
+        try:
+            st = os.stat(file_path)
+            key = hashlib.blake2b(os.path.abspath(file_path).encode('utf-8'), digest_size=16).hexdigest()
+            cache_path = Path(cache_dir) / f"{key}.pkl"
+            if cache_path.exists():
+                with open(cache_path, 'rb') as cf:
+                    record = pickle.load(cf)
+                if record.get('mtime_ns') == st.st_mtime_ns and record.get('size') == st.st_size:
+                    return file_path, record['funcs'], record['imports'], record['calls']
+        except Exception:
+            cache_path = None
+
+    func_names, imports, calls = extractor(file_path)
+
+    if cache_path is not None and st is not None:
+        try:
+            with open(cache_path, 'wb') as cf:
+                pickle.dump({'mtime_ns': st.st_mtime_ns, 'size': st.st_size,
+                             'funcs': func_names, 'imports': imports,
+                             'calls': calls}, cf)
+        except Exception:
+            pass
+
+    return file_path, func_names, imports, calls
+
+
+class _MetricsSoA:
+    """
+    文件级指标的按列（SoA）容器：六个平行数组 + 文件路径列表。
+    统计阶段直接在连续数组上向量化；只有 JSON/CSV 导出时才物化行字典
+    """
+    __slots__ = ('paths', 'import_in', 'import_out', 'fan_in', 'fan_out',
+                 'coupling_score', 'function_count')
+
+    def __init__(self, paths, import_in, import_out, fan_in, fan_out,
+                 coupling_score, function_count):
+        self.paths = paths
+        self.import_in = import_in
+        self.import_out = import_out
+        self.fan_in = fan_in
+        self.fan_out = fan_out
+        self.coupling_score = coupling_score
+        self.function_count = function_count
+
+    def to_rows(self) -> Dict[str, Dict[str, Any]]:
+        """物化为 {file: {指标}} 行字典，仅供报告导出"""
+        rows = {}
+        for k, file_path in enumerate(self.paths):
+            rows[file_path] = {
+                "import_in": int(self.import_in[k]),
+                "import_out": int(self.import_out[k]),
+                "fan_in_total": int(self.fan_in[k]),
+                "fan_out_total": int(self.fan_out[k]),
+                "coupling_score": round(float(self.coupling_score[k]), 3),
+                "function_count": int(self.function_count[k])
+            }
+        return rows
 
 
 class CouplingAnalyzer:
     """函数耦合度分析器"""
     
-    def __init__(self, language="python"):
+    def __init__(self, language="python", cache_dir=None):
         self.language = language
-        self.call_graph = nx.DiGraph()
-        self.import_graph = nx.DiGraph()
+        # 解析结果磁盘缓存目录；None 时使用 ~/.cache/coupling_analyzer
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "coupling_analyzer")
+        self.cache_dir = cache_dir
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError:
+            self.cache_dir = None
+        # 图以扁平边表存储：节点映射为整型 id，src/dst 为平行 int 列表。
+        # 本分析器只需要出入度，dict-of-dicts 的 DiGraph 存储纯属开销
+        self._call_node_idx = {}    # {full_name: int}
+        self._call_src = []
+        self._call_dst = []
+        self._import_node_idx = {}  # {file_path_or_module: int}
+        self._import_src = []
+        self._import_dst = []
+        self._file_idx = {}         # {file_path: int}，与 file_functions 插入顺序一致
+        self._func_file_idx = []    # 与调用图节点 id 平行：每个函数所属文件下标
         self.function_index = {}  # {function_name: file_path}
         self.file_functions = defaultdict(list)  # {file_path: [function_names]}
         
+    @property
+    def call_graph(self):
+        """按需物化的 NetworkX 视图，仅供可视化/调试；分析路径不再使用"""
+        import networkx as nx
+        g = nx.DiGraph()
+        names = list(self._call_node_idx)
+        g.add_nodes_from(names)
+        g.add_edges_from((names[s], names[d]) for s, d in zip(self._call_src, self._call_dst))
+        return g
+
+    @property
+    def import_graph(self):
+        """按需物化的 NetworkX 视图，仅供可视化/调试；分析路径不再使用"""
+        import networkx as nx
+        g = nx.DiGraph()
+        names = list(self._import_node_idx)
+        g.add_nodes_from(names)
+        g.add_edges_from((names[s], names[d]) for s, d in zip(self._import_src, self._import_dst))
+        return g
+
     def analyze_project(self, project_dir: str) -> Dict[str, Any]:
         """
         分析整个项目的耦合度
@@ -52,8 +314,14 @@ class CouplingAnalyzer:
         print(f"🔍 开始分析项目耦合度: {project_dir}")
         
         # 清空之前的分析结果
-        self.call_graph.clear()
-        self.import_graph.clear()
+        self._call_node_idx.clear()
+        self._call_src.clear()
+        self._call_dst.clear()
+        self._import_node_idx.clear()
+        self._import_src.clear()
+        self._import_dst.clear()
+        self._file_idx.clear()
+        self._func_file_idx.clear()
         self.function_index.clear()
         self.file_functions.clear()
         
@@ -61,13 +329,40 @@ class CouplingAnalyzer:
         source_files = self._get_source_files(project_dir)
         print(f"📄 发现 {len(source_files)} 个源文件")
         
-        # 第一遍：建立函数索引
-        for file_path in source_files:
-            self._index_functions(file_path)
-        
-        # 第二遍：分析调用关系
-        for file_path in source_files:
-            self._analyze_file_coupling(file_path)
+        # 并行解析：每个文件独立 read + parse（CPU 密集、文件间无依赖），
+        # 结果元组在主进程合并
+        with ProcessPoolExecutor() as executor:
+            parse_worker = partial(_parse_source_file, cache_dir=self.cache_dir)
+            parse_results = list(executor.map(parse_worker, source_files, chunksize=32))
+
+        # 第一遍：建立函数索引并分配整型节点 id
+        call_idx = self._call_node_idx
+        for file_path, func_names, _, _ in parse_results:
+            for func_name in func_names:
+                self.function_index[func_name] = file_path
+                self.file_functions[file_path].append(func_name)
+                full_name = f"{file_path}:{func_name}"
+                if full_name not in call_idx:
+                    call_idx[full_name] = len(call_idx)
+                    self._func_file_idx.append(
+                        self._file_idx.setdefault(file_path, len(self._file_idx)))
+
+        # 第二遍：解析调用/导入关系（此时 function_index 已完整），
+        # 直接追加整型 id 到扁平边表
+        import_idx = self._import_node_idx
+        for file_path, _, imports, calls in parse_results:
+            if imports:
+                src_id = import_idx.setdefault(file_path, len(import_idx))
+                for target in imports:
+                    self._import_src.append(src_id)
+                    self._import_dst.append(import_idx.setdefault(target, len(import_idx)))
+            for caller_func, callee in calls:
+                if callee in self.function_index:
+                    caller_id = call_idx.get(f"{file_path}:{caller_func}")
+                    callee_id = call_idx.get(f"{self.function_index[callee]}:{callee}")
+                    if caller_id is not None and callee_id is not None:
+                        self._call_src.append(caller_id)
+                        self._call_dst.append(callee_id)
         
         # 计算耦合度指标
         coupling_metrics = self._compute_coupling_metrics()
@@ -80,190 +375,96 @@ class CouplingAnalyzer:
     
     def _get_source_files(self, project_dir: str) -> List[str]:
         """获取项目中的所有源文件"""
-        source_files = []
-        supported_extensions = ['.py', '.java', '.js', '.ts', '.cpp', '.c', '.cs', '.go', '.rs']
-        for root, _, files in os.walk(project_dir):
-            for file in files:
-                if any(file.endswith(ext) for ext in supported_extensions):
-                    source_files.append(os.path.join(root, file))
-        return source_files
-    
-    def _index_functions(self, file_path: str):
-        """建立函数索引"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            if file_path.endswith('.py'):
-                self._index_python_functions(file_path, content)
-            # 可以扩展支持其他语言
-                
-        except Exception as e:
-            print(f"⚠️ 索引函数失败: {file_path} - {e}")
-    
-    def _index_python_functions(self, file_path: str, content: str):
-        """索引Python函数"""
-        try:
-            tree = ast.parse(content, filename=file_path)
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    func_name = node.name
-                    full_name = f"{file_path}:{func_name}"
-                    self.function_index[func_name] = file_path
-                    self.file_functions[file_path].append(func_name)
-                    self.call_graph.add_node(full_name)
-        except SyntaxError:
-            print(f"⚠️ 语法错误，跳过文件: {file_path}")
-    
-    def _analyze_file_coupling(self, file_path: str):
-        """分析文件的耦合度"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            if file_path.endswith('.py'):
-                self._analyze_python_coupling(file_path, content)
-                
-        except Exception as e:
-            print(f"⚠️ 分析耦合度失败: {file_path} - {e}")
-    
-    def _analyze_python_coupling(self, file_path: str, content: str):
-        """分析Python文件的耦合度"""
-        try:
-            tree = ast.parse(content, filename=file_path)
-            
-            # 分析导入关系
-            self._analyze_imports(file_path, tree)
-            
-            # 分析函数调用关系
-            self._analyze_function_calls(file_path, tree)
-                
-        except SyntaxError:
-            print(f"⚠️ 语法错误，跳过文件: {file_path}")
-    
-    def _analyze_imports(self, file_path: str, tree: ast.AST):
-        """分析导入关系"""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    self.import_graph.add_edge(file_path, alias.name)
-            elif isinstance(node, ast.ImportFrom):
-                if node.module:
-                    self.import_graph.add_edge(file_path, node.module)
+        return list(_iter_source_files(project_dir))
     
-    def _analyze_function_calls(self, file_path: str, tree: ast.AST):
-        """分析函数调用关系"""
-        class CallVisitor(ast.NodeVisitor):
-            def __init__(self, analyzer, file_path):
-                self.analyzer = analyzer
-                self.file_path = file_path
-                self.current_function = None
-            
-            def visit_FunctionDef(self, node):
-                prev_func = self.current_function
-                self.current_function = node.name
-                self.generic_visit(node)
-                self.current_function = prev_func
-            
-            def visit_Call(self, node):
-                if self.current_function:
-                    # 获取被调用函数名
-                    if isinstance(node.func, ast.Name):
-                        callee = node.func.id
-                    elif isinstance(node.func, ast.Attribute):
-                        callee = ast.unparse(node.func)
-                    else:
-                        callee = "unknown"
-                    
-                    # 建立调用关系
-                    caller = f"{self.file_path}:{self.current_function}"
-                    if callee in self.analyzer.function_index:
-                        callee_file = self.analyzer.function_index[callee]
-                        callee_full = f"{callee_file}:{callee}"
-                        self.analyzer.call_graph.add_edge(caller, callee_full)
-                
-                self.generic_visit(node)
-        
-        visitor = CallVisitor(self, file_path)
-        visitor.visit(tree)
-    
-    def _compute_coupling_metrics(self) -> Dict[str, Any]:
+    def _compute_coupling_metrics(self) -> "_MetricsSoA":
         """计算耦合度指标"""
-        metrics = {}
-        
-        for file_path in self.file_functions:
-            # 文件级指标
-            import_in = self.import_graph.in_degree(file_path)
-            import_out = self.import_graph.out_degree(file_path)
-            
-            # 函数级指标
-            file_functions = self.file_functions[file_path]
-            fan_in_total = 0
-            fan_out_total = 0
-            
-            for func_name in file_functions:
-                func_node = f"{file_path}:{func_name}"
-                fan_in = self.call_graph.in_degree(func_node)
-                fan_out = self.call_graph.out_degree(func_node)
-                fan_in_total += fan_in
-                fan_out_total += fan_out
-            
-            # 计算综合耦合度
-            coupling_score = import_in * 0.2 + import_out * 0.2 + fan_in_total * 0.3 + fan_out_total * 0.3
-            
-            metrics[file_path] = {
-                "import_in": import_in,
-                "import_out": import_out,
-                "fan_in_total": fan_in_total,
-                "fan_out_total": fan_out_total,
-                "coupling_score": round(coupling_score, 3),
-                "function_count": len(file_functions)
-            }
-        
-        return metrics
+        # 扁平边表上用 bincount 一次性求出所有节点的出入度
+        call_idx = self._call_node_idx
+        n_call = len(call_idx)
+        call_out_deg = np.bincount(np.asarray(self._call_src, dtype=np.int32), minlength=n_call)
+        call_in_deg = np.bincount(np.asarray(self._call_dst, dtype=np.int32), minlength=n_call)
+
+        import_idx = self._import_node_idx
+        n_import = len(import_idx)
+        import_out_deg = np.bincount(np.asarray(self._import_src, dtype=np.int32), minlength=n_import)
+        import_in_deg = np.bincount(np.asarray(self._import_dst, dtype=np.int32), minlength=n_import)
+
+        # 按文件聚合为连续数组，加权求和成为一次直线计算
+        file_paths = list(self.file_functions)
+        n_files = len(file_paths)
+
+        # 函数 -> 文件下标映射在索引阶段已建好，这里直接散射聚合
+        func_file_idx = np.asarray(self._func_file_idx, dtype=np.int32)
+        fan_in_arr = np.zeros(n_files, dtype=np.float64)
+        fan_out_arr = np.zeros(n_files, dtype=np.float64)
+        np.add.at(fan_in_arr, func_file_idx, call_in_deg)
+        np.add.at(fan_out_arr, func_file_idx, call_out_deg)
+
+        import_in_arr = np.zeros(n_files, dtype=np.float64)
+        import_out_arr = np.zeros(n_files, dtype=np.float64)
+        for k, file_path in enumerate(file_paths):
+            i = import_idx.get(file_path)
+            if i is not None:
+                import_in_arr[k] = import_in_deg[i]
+                import_out_arr[k] = import_out_deg[i]
+
+        # 计算综合耦合度（numba 可用时为并行 JIT 内核）
+        coupling_scores = _weighted_coupling_scores(import_in_arr, import_out_arr,
+                                                    fan_in_arr, fan_out_arr)
+
+        function_counts = np.fromiter((len(self.file_functions[fp]) for fp in file_paths),
+                                      dtype=np.int64, count=n_files)
+
+        return _MetricsSoA(paths=file_paths,
+                           import_in=import_in_arr,
+                           import_out=import_out_arr,
+                           fan_in=fan_in_arr,
+                           fan_out=fan_out_arr,
+                           coupling_score=np.round(coupling_scores, 3),
+                           function_count=function_counts)
     
-    def _generate_report(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_report(self, metrics: "_MetricsSoA") -> Dict[str, Any]:
         """生成分析报告"""
-        # 计算统计指标
-        coupling_scores = [m["coupling_score"] for m in metrics.values()]
-        import_in_scores = [m["import_in"] for m in metrics.values()]
-        import_out_scores = [m["import_out"] for m in metrics.values()]
-        fan_in_scores = [m["fan_in_total"] for m in metrics.values()]
-        fan_out_scores = [m["fan_out_total"] for m in metrics.values()]
-        
+        # SoA 列本身就是连续数组，统计量直接向量化计算
+        coupling_scores = metrics.coupling_score
+        cs_mean = coupling_scores.mean()
+        cs_std = coupling_scores.std()
+        q25, median, q75 = np.percentile(coupling_scores, [25, 50, 75])
+
         report = {
             "summary": {
-                "total_files": len(metrics),
-                "total_functions": sum(m["function_count"] for m in metrics.values()),
-                "avg_coupling_score": np.mean(coupling_scores),
-                "max_coupling_score": np.max(coupling_scores),
-                "min_coupling_score": np.min(coupling_scores),
-                "std_coupling_score": np.std(coupling_scores)
+                "total_files": len(metrics.paths),
+                "total_functions": int(metrics.function_count.sum()),
+                "avg_coupling_score": cs_mean,
+                "max_coupling_score": coupling_scores.max(),
+                "min_coupling_score": coupling_scores.min(),
+                "std_coupling_score": cs_std
             },
-            "metrics": metrics,
+            "metrics": metrics.to_rows(),
             "statistics": {
                 "coupling_score": {
-                    "mean": np.mean(coupling_scores),
-                    "std": np.std(coupling_scores),
-                    "median": np.median(coupling_scores),
-                    "q25": np.percentile(coupling_scores, 25),
-                    "q75": np.percentile(coupling_scores, 75)
+                    "mean": cs_mean,
+                    "std": cs_std,
+                    "median": median,
+                    "q25": q25,
+                    "q75": q75
                 },
                 "import_in": {
-                    "mean": np.mean(import_in_scores),
-                    "std": np.std(import_in_scores)
+                    "mean": metrics.import_in.mean(),
+                    "std": metrics.import_in.std()
                 },
                 "import_out": {
-                    "mean": np.mean(import_out_scores),
-                    "std": np.std(import_out_scores)
+                    "mean": metrics.import_out.mean(),
+                    "std": metrics.import_out.std()
                 },
                 "fan_in": {
-                    "mean": np.mean(fan_in_scores),
-                    "std": np.std(fan_in_scores)
+                    "mean": metrics.fan_in.mean(),
+                    "std": metrics.fan_in.std()
                 },
                 "fan_out": {
-                    "mean": np.mean(fan_out_scores),
-                    "std": np.std(fan_out_scores)
+                    "mean": metrics.fan_out.mean(),
+                    "std": metrics.fan_out.std()
                 }
             }
         }
@@ -274,27 +475,32 @@ class CouplingAnalyzer:
         """保存分析报告"""
         ensure_dir(os.path.dirname(output_path))
         
-        # 保存JSON报告
+        # 保存JSON报告（orjson 为 C 扩展且原生支持 numpy 标量，优先使用）
         json_path = output_path.replace('.csv', '.json')
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
-        
-        # 保存CSV报告
-        df_data = []
-        for file_path, metrics in report["metrics"].items():
-            row = {"file": file_path}
-            row.update(metrics)
-            df_data.append(row)
-        
-        df = pd.DataFrame(df_data)
-        df.to_csv(output_path, index=False, encoding='utf-8-sig')
+        if orjson is not None:
+            with open(json_path, 'wb') as f:
+                f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+        
+        # 保存CSV报告：扁平 dict-of-dicts 直接流式写出，无需 pandas
+        fields = ["file", "import_in", "import_out", "fan_in_total",
+                  "fan_out_total", "coupling_score", "function_count"]
+        with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for file_path, metrics in report["metrics"].items():
+                writer.writerow({"file": file_path, **metrics})
         
         print(f"📊 耦合度报告已保存:")
         print(f"   JSON: {json_path}")
         print(f"   CSV: {output_path}")
     
-    def visualize_coupling(self, report: Dict[str, Any], output_dir: str):
+    def visualize_coupling(self, report: Dict[str, Any], output_dir: str,
+                           show: bool = False, dpi: int = 150):
         """可视化耦合度分析结果"""
+        plt = _load_pyplot()
         ensure_dir(output_dir)
         
         # 设置中文字体
@@ -346,19 +552,25 @@ class CouplingAnalyzer:
         
         # 保存图表
         chart_path = os.path.join(output_dir, "coupling_analysis.png")
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
+        plt.savefig(chart_path, dpi=dpi, bbox_inches='tight')
         print(f"📈 耦合度分析图表已保存: {chart_path}")
-        plt.show()
+        if show:
+            plt.show()
+        plt.close()
     
     def compare_architectures(self, explicit_report: Dict[str, Any], 
                             implicit_report: Dict[str, Any], 
-                            output_dir: str):
+                            output_dir: str,
+                            show: bool = False, dpi: int = 150):
         """比较显性和非显性架构的耦合度差异"""
+        plt = _load_pyplot()
         ensure_dir(output_dir)
         
-        # 提取耦合度数据
-        exp_scores = [m["coupling_score"] for m in explicit_report["metrics"].values()]
-        imp_scores = [m["coupling_score"] for m in implicit_report["metrics"].values()]
+        # 提取耦合度数据（一次转成 ndarray，后续统计/绘图全部复用）
+        exp_scores = np.asarray([m["coupling_score"] for m in explicit_report["metrics"].values()],
+                                dtype=np.float64)
+        imp_scores = np.asarray([m["coupling_score"] for m in implicit_report["metrics"].values()],
+                                dtype=np.float64)
         
         # 统计检验
         from scipy.stats import ttest_ind, mannwhitneyu
@@ -366,9 +578,8 @@ class CouplingAnalyzer:
         t_stat, t_p = ttest_ind(exp_scores, imp_scores)
         u_stat, u_p = mannwhitneyu(exp_scores, imp_scores, alternative='two-sided')
         
-        # 计算效应量
-        from scipy.stats import cohen_d
-        effect_size = cohen_d(exp_scores, imp_scores)
+        # 计算效应量（scipy.stats 并不提供 cohen_d，原导入在运行时必然报错）
+        effect_size = _cohen_d(exp_scores, imp_scores)
         
         # 创建对比图
         plt.figure(figsize=(15, 10))
@@ -460,9 +671,11 @@ class CouplingAnalyzer:
         
         # 保存对比图
         comparison_path = os.path.join(output_dir, "architecture_comparison.png")
-        plt.savefig(comparison_path, dpi=300, bbox_inches='tight')
+        plt.savefig(comparison_path, dpi=dpi, bbox_inches='tight')
         print(f"📊 架构对比图已保存: {comparison_path}")
-        plt.show()
+        if show:
+            plt.show()
+        plt.close()
         
         # 打印统计结果
         print(f"\n📊 统计检验结果:")
@@ -17,10 +17,16 @@ data_builder.py
 """
 
 import os
+import re
 import ast
 import json
 import random
 import shutil
+import hashlib
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import Counter
+from functools import lru_cache, partial
 import networkx as nx
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -28,29 +34,124 @@ import numpy as np
 from tqdm import tqdm
 from pathlib import Path
 from sklearn.model_selection import train_test_split
+
+try:
+    import orjson  # C 级 JSON 序列化，大样本量下比 stdlib json 快 5-10 倍
+except ImportError:
+    orjson = None
 from scipy.stats import ttest_ind
 
 
+# ========= 预编译正则 ==========
+# 这些模式在每文件循环里以百万次量级执行，统一在模块导入时编译，
+# 避免 re 内部缓存探查与潜在的重复编译
+# 函数签名模式统一锚定行首（^ + MULTILINE）并把 \s/[^)] 收紧为不跨行的
+# [ \t]/[^)\n]：未锚定的 (?:...)* 修饰符组在长行上会产生灾难性回溯
+_JAVA_METHOD_RE = re.compile(
+    r'^[ \t]*((?:(?:public|private|protected|static|final|abstract|synchronized)[ \t]+)*)'
+    r'(\w+(?:<[^>\n]*>)?)[ \t]+(\w+)[ \t]*\([^)\n]*\)[ \t]*\{', re.MULTILINE)
+_JS_FUNC_RES = [
+    re.compile(r'^[ \t]*function[ \t]+(\w+)[ \t]*\([^)\n]*\)[ \t]*\{', re.MULTILINE),  # function name() {}
+    re.compile(r'^[ \t]*(\w+)[ \t]*:[ \t]*function[ \t]*\([^)\n]*\)[ \t]*\{', re.MULTILINE),  # name: function() {}
+    re.compile(r'^[ \t]*(\w+)[ \t]*\([^)\n]*\)[ \t]*=>[ \t]*\{', re.MULTILINE),  # name() => {}
+    re.compile(r'^[ \t]*const[ \t]+(\w+)[ \t]*=[ \t]*\([^)\n]*\)[ \t]*=>[ \t]*\{', re.MULTILINE),  # const name = () => {}
+]
+_CPP_FUNC_RE = re.compile(
+    r'^[ \t]*([\w:]+(?:[ \t]*<[^>\n]*>)?)[ \t]+(\w+)[ \t]*\([^)\n]*\)[ \t]*\{', re.MULTILINE)
+_CS_METHOD_RE = re.compile(
+    r'^[ \t]*((?:(?:public|private|protected|internal|static|virtual|override|abstract|sealed)[ \t]+)*)'
+    r'(\w+(?:<[^>\n]*>)?)[ \t]+(\w+)[ \t]*\([^)\n]*\)[ \t]*\{', re.MULTILINE)
+_GENERIC_FUNC_RES = [
+    re.compile(r'^[ \t]*(\w+)[ \t]*\([^)\n]*\)[ \t]*\{', re.MULTILINE),  # name() {
+    re.compile(r'^[ \t]*function[ \t]+(\w+)[ \t]*\([^)\n]*\)[ \t]*\{', re.MULTILINE),  # function name() {
+]
+_JAVA_IMPORT_RE = re.compile(r'import\s+(?:static\s+)?([^;]+);')
+_JS_IMPORT_RES = [
+    re.compile(r'import\s+.*?\s+from\s+[\'"]([^\'"]+)[\'"]'),  # import ... from '...'
+    re.compile(r'import\s+[\'"]([^\'"]+)[\'"]'),  # import '...'
+    re.compile(r'require\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)'),  # require('...')
+]
+_CPP_INCLUDE_RE = re.compile(r'#include\s*[<"]([^>"]+)[>"]')
+_CS_USING_RE = re.compile(r'using\s+([^;]+);')
+_GENERIC_IMPORT_RES = [
+    re.compile(r'import\s+([^;]+);'),  # import ...;
+    re.compile(r'#include\s*[<"]([^>"]+)[>"]'),  # #include <...>
+    re.compile(r'using\s+([^;]+);'),  # using ...;
+]
+_CALL_RE = re.compile(r'(\w+)\s*\(')
+
+
 # ========= 基础工具 ==========
 def ensure_dir(path):
     """确保目录存在"""
     os.makedirs(path, exist_ok=True)
 
 
+_SOURCE_EXTS = frozenset({"py", "java", "js", "ts", "cpp", "c", "cs", "go", "rs"})
+
+
+def iter_source_files(base_dir, extensions=_SOURCE_EXTS):
+    """递归遍历目录，逐个产出源代码文件路径（os.scandir，免去多余 stat）"""
+    stack = [str(base_dir)]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif '.' in entry.name and entry.name.rpartition('.')[2] in extensions:
+                    # 要求带扩展名点号，免得恰好叫 java 的无后缀文件误入
+                    yield entry.path
+
+
 def list_source_files(base_dir, supported_extensions=None):
     """递归列出目录下的所有源代码文件"""
     if supported_extensions is None:
-        supported_extensions = [".py", ".java", ".js", ".ts", ".cpp", ".c", ".cs", ".go", ".rs"]
-    
-    source_files = []
-    for root, _, files in os.walk(base_dir):
-        for f in files:
-            if any(f.endswith(ext) for ext in supported_extensions):
-                source_files.append(os.path.join(root, f))
-    return source_files
+        extensions = _SOURCE_EXTS
+    else:
+        extensions = frozenset(ext.lstrip('.') for ext in supported_extensions)
+    return list(iter_source_files(base_dir, extensions))
 
 
 # ========= 1️⃣ 显性 / 非显性 副本生成 ==========
+def _copy_one(f, src_dir, explicit_dir, implicit_dir):
+    """复制单个文件的显性/非显性副本（供线程池调用）"""
+    rel_path = os.path.relpath(f, src_dir)
+
+    # 显性架构副本：保持原有目录结构，单次写入（路径注释 + 原内容），
+    # 避免 复制→重读→重写 的三次磁盘往返；
+    # 只对能按 UTF-8 解码的文本文件加注释，二进制/异常编码文件原样复制
+    explicit_dst = explicit_dir / rel_path
+    ensure_dir(explicit_dst.parent)
+    try:
+        with open(f, "rb") as src_file:
+            raw = src_file.read()
+        try:
+            raw.decode("utf-8")
+        except UnicodeDecodeError:
+            shutil.copyfile(f, explicit_dst)
+        else:
+            with open(explicit_dst, "wb") as dst_file:
+                dst_file.write(f"# FILE_PATH: {rel_path}\n".encode("utf-8"))
+                dst_file.write(raw)
+    except Exception as e:
+        print(f"⚠️ 处理文件失败: {explicit_dst} - {e}")
+
+    # 非显性架构副本：打乱结构，稳定哈希命名
+    # blake2b 不受 PYTHONHASHSEED 影响，跨运行可复现且 48 位基本无碰撞；
+    # 目标已存在时跳过复制，增量构建幂等
+    file_hash = hashlib.blake2b(rel_path.encode("utf-8"), digest_size=6).hexdigest()
+    file_ext = os.path.splitext(f)[1]  # 保持原文件扩展名
+    implicit_dst = implicit_dir / f"file_{file_hash}{file_ext}"
+    if not implicit_dst.exists():
+        # copyfile 走内核零拷贝路径（Linux 上为 sendfile）
+        shutil.copyfile(f, implicit_dst)
+
+
 def make_copies(src_dir, out_dir):
     """
     生成显性和非显性架构副本
@@ -71,29 +172,14 @@ def make_copies(src_dir, out_dir):
     source_files = list_source_files(src_dir)
     print(f"📄 发现 {len(source_files)} 个源代码文件")
 
-    for f in tqdm(source_files, desc="生成架构副本"):
-        rel_path = os.path.relpath(f, src_dir)
-        
-        # 显性架构副本：保持原有目录结构
-        explicit_dst = explicit_dir / rel_path
-        ensure_dir(explicit_dst.parent)
-        shutil.copy(f, explicit_dst)
-        
-        # 添加路径注释以增强位置信号
-        try:
-            with open(explicit_dst, "r", encoding="utf-8") as src_file:
-                content = src_file.read()
-            path_comment = f"# FILE_PATH: {rel_path}\n"
-            with open(explicit_dst, "w", encoding="utf-8") as dst_file:
-                dst_file.write(path_comment + content)
-        except Exception as e:
-            print(f"⚠️ 处理文件失败: {explicit_dst} - {e}")
-        
-        # 非显性架构副本：打乱结构，随机命名
-        file_hash = abs(hash(rel_path)) % 999999
-        file_ext = os.path.splitext(f)[1]  # 保持原文件扩展名
-        implicit_dst = implicit_dir / f"file_{file_hash:06d}{file_ext}"
-        shutil.copy(f, implicit_dst)
+    # 文件复制是 I/O 密集操作（read/write 期间释放 GIL），用线程池流水并行
+    copy_one = partial(_copy_one, src_dir=src_dir,
+                       explicit_dir=explicit_dir, implicit_dir=implicit_dir)
+    max_workers = min(32, (os.cpu_count() or 4) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for _ in tqdm(executor.map(copy_one, source_files),
+                      total=len(source_files), desc="生成架构副本"):
+            pass
 
     print(f"✅ 已生成显性/非显性副本")
     print(f"   显性架构: {explicit_dir}")
@@ -105,57 +191,29 @@ def make_copies(src_dir, out_dir):
 # ========= 2️⃣ 函数补全任务样本生成 ==========
 def make_completion_samples(project_dir, label):
     """
-    生成函数补全任务样本
+    生成函数补全任务样本（生成器：逐文件产出，整库样本不再全量驻留内存）
     
     Args:
         project_dir: 项目目录
         label: 样本标签 ('explicit' 或 'non_explicit')
         
-    Returns:
-        list: 样本列表
+    Yields:
+        dict: 单个补全样本
     """
-    samples = []
     source_files = list_source_files(project_dir)
     
     print(f"🔧 生成补全样本 [{label}] - {len(source_files)} 个文件")
     
-    for f in tqdm(source_files, desc=f"处理 {label} 样本"):
-        try:
-            with open(f, "r", encoding="utf-8") as src:
-                content = src.read()
-            
-            # 解析AST，提取函数定义
-            try:
-                functions = extract_functions_from_code(content, f)
-            except Exception as e:
-                print(f"⚠️ 解析错误，跳过文件: {f} - {e}")
-                continue
-            
-            # 为每个函数生成补全样本
-            for func_info in functions:
-                if len(func_info['body'].strip()) < 10:  # 跳过太短的函数
-                    continue
-                    
-                # 创建掩盖版本
-                masked_content = create_masked_function(content, func_info)
-                
-                sample = {
-                    "file": f,
-                    "input": masked_content,
-                    "target": func_info['body'],
-                    "function_name": func_info['name'],
-                    "view": label,
-                    "line_start": func_info['line_start'],
-                    "line_end": func_info['line_end']
-                }
-                samples.append(sample)
-                
-        except Exception as e:
-            print(f"⚠️ 处理文件失败: {f} - {e}")
-            continue
+    # 每个文件的 读取+解析+掩码 相互独立且 CPU 密集，交给进程池
+    tasks = [(f, label) for f in source_files]
+    count = 0
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for batch in tqdm(executor.map(_process_file_for_samples, tasks, chunksize=16),
+                          total=len(tasks), desc=f"处理 {label} 样本"):
+            count += len(batch)
+            yield from batch
     
-    print(f"✅ 生成 {len(samples)} 个补全样本 [{label}]")
-    return samples
+    print(f"✅ 生成 {count} 个补全样本 [{label}]")
 
 
 def extract_functions_from_code(content, file_path):
@@ -163,7 +221,7 @@ def extract_functions_from_code(content, file_path):
     file_ext = os.path.splitext(file_path)[1].lower()
     
     if file_ext == '.py':
-        return extract_python_functions(content)
+        return extract_python_functions(content, path=file_path)
     elif file_ext == '.java':
         return extract_java_functions(content)
     elif file_ext in ['.js', '.ts']:
@@ -177,297 +235,252 @@ def extract_functions_from_code(content, file_path):
         return extract_functions_with_regex(content, file_ext)
 
 
-def extract_python_functions(content):
+@lru_cache(maxsize=256)
+def _parse_py(path, mtime):
+    """
+    解析 Python 文件为 AST，按 (路径, mtime) 缓存。
+    补全样本生成和耦合分析都会解析同一批文件，缓存避免重复 parse；
+    mtime 参与键值，文件变化后自动失效。
+    """
+    with open(path, "rb") as f:
+        return ast.parse(f.read(), filename=path)
+
+
+class _FuncCollector(ast.NodeVisitor):
+    """收集 FunctionDef / AsyncFunctionDef 节点（替代 ast.walk 全树 isinstance 过滤）"""
+
+    def __init__(self):
+        self.functions = []
+
+    def visit_FunctionDef(self, node):
+        self.functions.append(node)
+        self.generic_visit(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+
+def extract_python_functions(content, path=None):
     """提取Python函数"""
+    if 'def ' not in content:
+        return []
+
     functions = []
     try:
-        tree = ast.parse(content)
-        lines = content.split('\n')
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                start_line = node.lineno - 1
-                end_line = node.end_lineno if hasattr(node, 'end_lineno') else start_line + 1
-                
-                func_lines = lines[start_line:end_line]
-                func_body = '\n'.join(func_lines)
-                
-                body_start = func_body.find(':') + 1
-                if body_start > 0:
-                    body_content = func_body[body_start:].strip()
-                    if body_content:
-                        functions.append({
-                            'name': node.name,
-                            'body': body_content,
-                            'line_start': node.lineno,
-                            'line_end': node.end_lineno if hasattr(node, 'end_lineno') else node.lineno
-                        })
-    except Exception:
-        pass
-    
-    return functions
+        if path is not None:
+            tree = _parse_py(path, os.path.getmtime(path))
+        else:
+            tree = ast.parse(content)
 
+        collector = _FuncCollector()
+        collector.visit(tree)
+        line_starts = _line_starts(content)
+        for node in collector.functions:
+            start_line = node.lineno - 1
+            end_line = node.end_lineno
 
-def extract_java_functions(content):
-    """提取Java方法"""
-    import re
-    functions = []
-    lines = content.split('\n')
-    
-    # Java方法模式：修饰符 + 返回类型 + 方法名 + 参数 + {
-    method_pattern = r'(\s*(?:public|private|protected|static|final|abstract|synchronized)\s+)*(\w+(?:<[^>]*>)?)\s+(\w+)\s*\([^)]*\)\s*\{'
-    
-    for i, line in enumerate(lines):
-        match = re.search(method_pattern, line)
-        if match:
-            method_name = match.group(3)
-            
-            # 找到方法体的结束位置
-            brace_count = 0
-            start_line = i
-            end_line = i
-            
-            for j in range(i, len(lines)):
-                line_content = lines[j]
-                brace_count += line_content.count('{')
-                brace_count -= line_content.count('}')
-                
-                if brace_count == 0 and j > i:
-                    end_line = j
-                    break
-            
-            # 提取方法体
-            method_lines = lines[start_line:end_line + 1]
-            method_body = '\n'.join(method_lines)
-            
-            # 找到第一个{后的内容
-            body_start = method_body.find('{') + 1
+            # 直接按行偏移切片原文，避免 split('\n') + join 的整文件重组
+            func_body = content[line_starts[start_line]:line_starts[end_line] - 1]
+
+            body_start = func_body.find(':') + 1
             if body_start > 0:
-                body_content = method_body[body_start:].strip()
-                if body_content and len(body_content) > 10:
+                body_content = func_body[body_start:].strip()
+                if body_content:
                     functions.append({
-                        'name': method_name,
+                        'name': node.name,
                         'body': body_content,
-                        'line_start': start_line + 1,
-                        'line_end': end_line + 1
+                        'line_start': node.lineno,
+                        'line_end': node.end_lineno,
+                        'def_line': node.lineno
                     })
+    except Exception:
+        pass
     
     return functions
 
 
-def extract_javascript_functions(content):
-    """提取JavaScript/TypeScript函数"""
-    import re
+def _line_starts(content):
+    """
+    每行起始字符偏移，末尾附加 len(content)+1 哨兵：
+    content[starts[a]:starts[b+1]-1] 即第 a..b 行（0-based）的原文
+    """
+    starts = [0]
+    i = content.find('\n')
+    while i != -1:
+        starts.append(i + 1)
+        i = content.find('\n', i + 1)
+    starts.append(len(content) + 1)
+    return starts
+
+
+def _extract_brace_functions(content, patterns, min_body_chars=10):
+    """
+    花括号语言的通用函数提取：
+    - 对整个 content 做一次 finditer（C 级扫描），而非逐行 re.search
+    - 从签名末尾的 '{' 开始直接在 content 上扫描配对花括号
+    - 行号通过一次性构建的行偏移表二分得到
+
+    Args:
+        patterns: [(compiled_pattern, 函数名所在分组号)] 列表
+    """
+    # 廉价子串预筛：所有模式都要求 '(' 和 '{'，str.__contains__ 远快于正则
+    if '{' not in content or '(' not in content:
+        return []
+
     functions = []
-    lines = content.split('\n')
-    
-    # JavaScript函数模式
-    patterns = [
-        r'function\s+(\w+)\s*\([^)]*\)\s*\{',  # function name() {}
-        r'(\w+)\s*:\s*function\s*\([^)]*\)\s*\{',  # name: function() {}
-        r'(\w+)\s*\([^)]*\)\s*=>\s*\{',  # name() => {}
-        r'const\s+(\w+)\s*=\s*\([^)]*\)\s*=>\s*\{',  # const name = () => {}
-    ]
-    
-    for pattern in patterns:
-        for i, line in enumerate(lines):
-            match = re.search(pattern, line)
-            if match:
-                func_name = match.group(1)
-                
-                # 找到函数体的结束位置
-                brace_count = 0
-                start_line = i
-                end_line = i
-                
-                for j in range(i, len(lines)):
-                    line_content = lines[j]
-                    brace_count += line_content.count('{')
-                    brace_count -= line_content.count('}')
-                    
-                    if brace_count == 0 and j > i:
-                        end_line = j
-                        break
-                
-                # 提取函数体
-                func_lines = lines[start_line:end_line + 1]
-                func_body = '\n'.join(func_lines)
-                
-                body_start = func_body.find('{') + 1
-                if body_start > 0:
-                    body_content = func_body[body_start:].strip()
-                    if body_content and len(body_content) > 10:
-                        functions.append({
-                            'name': func_name,
-                            'body': body_content,
-                            'line_start': start_line + 1,
-                            'line_end': end_line + 1
-                        })
-    
+    line_starts = _line_starts(content)
+
+    # 花括号深度前缀和：一次 numpy 扫描代替逐字符 Python 循环。
+    # latin-1 + replace 保证 字符↔字节 一一对应，花括号本身是 ASCII 不受影响
+    buf = np.frombuffer(content.encode('latin-1', 'replace'), dtype=np.uint8)
+    depth = np.cumsum((buf == 0x7b).astype(np.int8) - (buf == 0x7d).astype(np.int8))
+
+    for pattern, name_group in patterns:
+        for m in pattern.finditer(content):
+            func_name = m.group(name_group)
+            open_idx = m.end() - 1  # 模式以 '{' 结尾
+
+            # 配对的 '}' 是 open_idx 之后第一个使深度回落到 depth[open_idx]-1 的位置
+            tail = depth[open_idx + 1:]
+            close_idx = -1
+            if tail.size:
+                hits = tail == depth[open_idx] - 1
+                rel = int(np.argmax(hits))
+                if hits[rel]:
+                    close_idx = open_idx + 1 + rel
+
+            # 以函数名所在位置定位起始行
+            start_line = bisect_right(line_starts, m.start(name_group)) - 1
+            end_line = (bisect_right(line_starts, close_idx) - 1
+                        if close_idx != -1 else start_line)
+
+            # 函数体：第一个 '{' 之后到结束行行末
+            body_content = content[open_idx + 1:line_starts[end_line + 1] - 1].strip()
+            if body_content and len(body_content) > min_body_chars:
+                functions.append({
+                    'name': func_name,
+                    'body': body_content,
+                    'line_start': start_line + 1,
+                    'line_end': end_line + 1
+                })
+
     return functions
 
 
+def extract_java_functions(content):
+    """提取Java方法"""
+    return _extract_brace_functions(content, [(_JAVA_METHOD_RE, 3)])
+
+
+def extract_javascript_functions(content):
+    """提取JavaScript/TypeScript函数"""
+    return _extract_brace_functions(content, [(p, 1) for p in _JS_FUNC_RES])
+
+
 def extract_cpp_functions(content):
     """提取C++函数"""
-    import re
-    functions = []
-    lines = content.split('\n')
-    
-    # C++函数模式
-    function_pattern = r'(\w+(?:\s*<[^>]*>)?)\s+(\w+)\s*\([^)]*\)\s*\{'
-    
-    for i, line in enumerate(lines):
-        match = re.search(function_pattern, line)
-        if match:
-            func_name = match.group(2)
-            
-            # 找到函数体的结束位置
-            brace_count = 0
-            start_line = i
-            end_line = i
-            
-            for j in range(i, len(lines)):
-                line_content = lines[j]
-                brace_count += line_content.count('{')
-                brace_count -= line_content.count('}')
-                
-                if brace_count == 0 and j > i:
-                    end_line = j
-                    break
-            
-            # 提取函数体
-            func_lines = lines[start_line:end_line + 1]
-            func_body = '\n'.join(func_lines)
-            
-            body_start = func_body.find('{') + 1
-            if body_start > 0:
-                body_content = func_body[body_start:].strip()
-                if body_content and len(body_content) > 10:
-                    functions.append({
-                        'name': func_name,
-                        'body': body_content,
-                        'line_start': start_line + 1,
-                        'line_end': end_line + 1
-                    })
-    
-    return functions
+    return _extract_brace_functions(content, [(_CPP_FUNC_RE, 2)])
 
 
 def extract_csharp_functions(content):
     """提取C#方法"""
-    import re
-    functions = []
-    lines = content.split('\n')
-    
-    # C#方法模式
-    method_pattern = r'(\s*(?:public|private|protected|internal|static|virtual|override|abstract|sealed)\s+)*(\w+(?:<[^>]*>)?)\s+(\w+)\s*\([^)]*\)\s*\{'
-    
-    for i, line in enumerate(lines):
-        match = re.search(method_pattern, line)
-        if match:
-            method_name = match.group(3)
-            
-            # 找到方法体的结束位置
-            brace_count = 0
-            start_line = i
-            end_line = i
-            
-            for j in range(i, len(lines)):
-                line_content = lines[j]
-                brace_count += line_content.count('{')
-                brace_count -= line_content.count('}')
-                
-                if brace_count == 0 and j > i:
-                    end_line = j
-                    break
-            
-            # 提取方法体
-            method_lines = lines[start_line:end_line + 1]
-            method_body = '\n'.join(method_lines)
-            
-            body_start = method_body.find('{') + 1
-            if body_start > 0:
-                body_content = method_body[body_start:].strip()
-                if body_content and len(body_content) > 10:
-                    functions.append({
-                        'name': method_name,
-                        'body': body_content,
-                        'line_start': start_line + 1,
-                        'line_end': end_line + 1
-                    })
-    
-    return functions
+    return _extract_brace_functions(content, [(_CS_METHOD_RE, 3)])
 
 
 def extract_functions_with_regex(content, file_ext):
     """使用正则表达式提取函数（通用方法）"""
-    import re
-    functions = []
-    lines = content.split('\n')
-    
-    # 通用函数模式
-    patterns = [
-        r'(\w+)\s*\([^)]*\)\s*\{',  # name() {
-        r'function\s+(\w+)\s*\([^)]*\)\s*\{',  # function name() {
-    ]
-    
-    for pattern in patterns:
-        for i, line in enumerate(lines):
-            match = re.search(pattern, line)
-            if match:
-                func_name = match.group(1)
-                
-                # 找到函数体的结束位置
-                brace_count = 0
-                start_line = i
-                end_line = i
-                
-                for j in range(i, len(lines)):
-                    line_content = lines[j]
-                    brace_count += line_content.count('{')
-                    brace_count -= line_content.count('}')
-                    
-                    if brace_count == 0 and j > i:
-                        end_line = j
-                        break
-                
-                # 提取函数体
-                func_lines = lines[start_line:end_line + 1]
-                func_body = '\n'.join(func_lines)
-                
-                body_start = func_body.find('{') + 1
-                if body_start > 0:
-                    body_content = func_body[body_start:].strip()
-                    if body_content and len(body_content) > 10:
-                        functions.append({
-                            'name': func_name,
-                            'body': body_content,
-                            'line_start': start_line + 1,
-                            'line_end': end_line + 1
-                        })
-    
-    return functions
+    return _extract_brace_functions(content, [(p, 1) for p in _GENERIC_FUNC_RES])
 
 
 def create_masked_function(content, func_info):
     """创建掩盖函数体的版本"""
-    lines = content.split('\n')
-    start_line = func_info['line_start'] - 1
+    line_starts = _line_starts(content)
+    # 提取阶段已记录定义行（def_line），无需再逐行扫描重新定位
+    def_line = func_info.get('def_line', func_info['line_start']) - 1
     end_line = func_info['line_end'] - 1
     
-    # 找到函数定义行
-    func_def_line = start_line
-    for i in range(start_line, min(end_line + 1, len(lines))):
-        if 'def ' in lines[i] and func_info['name'] in lines[i]:
-            func_def_line = i
-            break
-    
-    # 创建掩盖版本
-    masked_lines = lines[:func_def_line + 1]  # 保留函数定义行
-    masked_lines.append("    # [MASKED_FUNCTION_BODY]")
-    masked_lines.extend(lines[end_line + 1:])  # 保留函数后的内容
-    
-    return '\n'.join(masked_lines)
+    # 保留定义行及之前的内容 + 掩码标记 + 函数之后的内容
+    masked = content[:line_starts[def_line + 1] - 1] + "\n    # [MASKED_FUNCTION_BODY]"
+    if end_line + 1 < len(line_starts) - 1:
+        masked += "\n" + content[line_starts[end_line + 1]:]
+    return masked
+
+
+@lru_cache(maxsize=8192)
+def _extract_cached(path, mtime):
+    """
+    读取文件并提取函数信息，按 (路径, mtime) 缓存。
+    样本生成与耦合分析共享同一份提取结果，避免重复读盘和解析。
+
+    Returns:
+        (content, functions) 元组
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    return content, extract_functions_from_code(content, path)
+
+
+def _process_file_for_samples(task):
+    """
+    进程池 worker：对单个文件完成 读取 + 函数提取 + 掩码，返回样本列表
+
+    Args:
+        task: (file_path, label) 元组
+    """
+    f, label = task
+    samples = []
+    try:
+        try:
+            content, functions = _extract_cached(f, os.path.getmtime(f))
+        except Exception as e:
+            print(f"⚠️ 解析错误，跳过文件: {f} - {e}")
+            return samples
+
+        for func_info in functions:
+            if len(func_info['body'].strip()) < 10:  # 跳过太短的函数
+                continue
+
+            masked_content = create_masked_function(content, func_info)
+
+            samples.append({
+                "file": f,
+                "input": masked_content,
+                "target": func_info['body'],
+                "function_name": func_info['name'],
+                "view": label,
+                "line_start": func_info['line_start'],
+                "line_end": func_info['line_end']
+            })
+    except Exception as e:
+        print(f"⚠️ 处理文件失败: {f} - {e}")
+    return samples
+
+
+def _process_file_for_coupling(f):
+    """
+    进程池 worker：分析单个文件的导入与调用关系
+
+    Returns:
+        (file_path, 导入目标列表, [(调用方, 被调用名)])
+    """
+    imports = []
+    calls = []
+    try:
+        file_ext = os.path.splitext(f)[1].lower()
+        if file_ext == '.py':
+            # 导入与调用共用 _parse_py 缓存的同一棵 AST
+            imports = parse_python_imports(f)
+            tree = _parse_py(f, os.path.getmtime(f))
+            analyzer = FunctionCallAnalyzer(f)
+            analyzer.visit(tree)
+            calls = analyzer.calls
+        else:
+            # 只读一次文件：复用缓存的内容与函数提取结果
+            content, functions = _extract_cached(f, os.path.getmtime(f))
+            imports = parse_imports_from_content(content, file_ext)
+            calls = analyze_calls_with_regex(content, f, functions=functions)
+    except Exception:
+        pass
+    return f, imports, calls
 
 
 # ========= 3️⃣ 函数调用与导入图分析 ==========
@@ -504,27 +517,37 @@ def parse_imports(filepath):
     
     if file_ext == '.py':
         return parse_python_imports(filepath)
-    elif file_ext == '.java':
-        return parse_java_imports(filepath)
-    elif file_ext in ['.js', '.ts']:
-        return parse_javascript_imports(filepath)
-    elif file_ext in ['.cpp', '.c']:
-        return parse_cpp_imports(filepath)
-    elif file_ext == '.cs':
-        return parse_csharp_imports(filepath)
+    
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            content = f.read()
+    except Exception:
+        return []
+    return parse_imports_from_content(content, file_ext)
+
+
+def parse_imports_from_content(content, ext):
+    """从已读入的内容解析导入语句（调用方只需打开文件一次）"""
+    if ext == '.py':
+        try:
+            return _python_imports_from_tree(ast.parse(content))
+        except Exception:
+            return []
+    elif ext == '.java':
+        return parse_java_imports(content)
+    elif ext in ['.js', '.ts']:
+        return parse_javascript_imports(content)
+    elif ext in ['.cpp', '.c']:
+        return parse_cpp_imports(content)
+    elif ext == '.cs':
+        return parse_csharp_imports(content)
     else:
-        return parse_imports_with_regex(filepath)
+        return parse_imports_with_regex(content)
 
 
-def parse_python_imports(filepath):
-    """解析Python导入语句"""
+def _python_imports_from_tree(tree):
+    """从 AST 中提取导入的模块名"""
     imports = []
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            tree = ast.parse(f.read(), filename=filepath)
-    except Exception:
-        return imports
-    
     for node in ast.walk(tree):
         if isinstance(node, ast.Import):
             for alias in node.names:
@@ -532,126 +555,68 @@ def parse_python_imports(filepath):
         elif isinstance(node, ast.ImportFrom):
             if node.module:
                 imports.append(node.module)
-    
     return imports
 
 
-def parse_java_imports(filepath):
-    """解析Java导入语句"""
-    import re
-    imports = []
+def parse_python_imports(filepath):
+    """解析Python导入语句"""
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # Java import语句模式
-        import_pattern = r'import\s+(?:static\s+)?([^;]+);'
-        matches = re.findall(import_pattern, content)
-        
-        for match in matches:
-            imports.append(match.strip())
+        tree = _parse_py(filepath, os.path.getmtime(filepath))
     except Exception:
-        pass
-    
-    return imports
+        return []
+    return _python_imports_from_tree(tree)
 
 
-def parse_javascript_imports(filepath):
+def parse_java_imports(content):
+    """解析Java导入语句"""
+    if 'import' not in content:
+        return []
+    return [match.strip() for match in _JAVA_IMPORT_RE.findall(content)]
+
+
+def parse_javascript_imports(content):
     """解析JavaScript/TypeScript导入语句"""
-    import re
     imports = []
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # JavaScript/TypeScript导入模式
-        patterns = [
-            r'import\s+.*?\s+from\s+[\'"]([^\'"]+)[\'"]',  # import ... from '...'
-            r'import\s+[\'"]([^\'"]+)[\'"]',  # import '...'
-            r'require\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)',  # require('...')
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, content)
-            imports.extend(matches)
-    except Exception:
-        pass
-    
+    if 'import' not in content and 'require' not in content:
+        return imports
+    for pattern in _JS_IMPORT_RES:
+        imports.extend(pattern.findall(content))
     return imports
 
 
-def parse_cpp_imports(filepath):
+def parse_cpp_imports(content):
     """解析C++导入语句"""
-    import re
-    imports = []
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # C++ include语句模式
-        include_pattern = r'#include\s*[<"]([^>"]+)[>"]'
-        matches = re.findall(include_pattern, content)
-        
-        for match in matches:
-            imports.append(match.strip())
-    except Exception:
-        pass
-    
-    return imports
+    if '#include' not in content:
+        return []
+    return [match.strip() for match in _CPP_INCLUDE_RE.findall(content)]
 
 
-def parse_csharp_imports(filepath):
+def parse_csharp_imports(content):
     """解析C#导入语句"""
-    import re
-    imports = []
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # C# using语句模式
-        using_pattern = r'using\s+([^;]+);'
-        matches = re.findall(using_pattern, content)
-        
-        for match in matches:
-            imports.append(match.strip())
-    except Exception:
-        pass
-    
-    return imports
+    if 'using' not in content:
+        return []
+    return [match.strip() for match in _CS_USING_RE.findall(content)]
 
 
-def parse_imports_with_regex(filepath):
+def parse_imports_with_regex(content):
     """使用正则表达式解析导入语句（通用方法）"""
-    import re
     imports = []
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # 通用导入模式
-        patterns = [
-            r'import\s+([^;]+);',  # import ...;
-            r'#include\s*[<"]([^>"]+)[>"]',  # #include <...>
-            r'using\s+([^;]+);',  # using ...;
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, content)
-            imports.extend(matches)
-    except Exception:
-        pass
-    
+    if ('import' not in content and '#include' not in content
+            and 'using' not in content):
+        return imports
+    for pattern in _GENERIC_IMPORT_RES:
+        imports.extend(pattern.findall(content))
     return imports
 
 
-def analyze_calls_with_regex(content, filepath):
+def analyze_calls_with_regex(content, filepath, functions=None):
     """使用正则表达式分析函数调用（通用方法）"""
-    import re
     calls = []
     lines = content.split('\n')
     
-    # 首先提取所有函数定义
-    functions = extract_functions_from_code(content, filepath)
+    # 首先提取所有函数定义（调用方可传入已缓存的提取结果）
+    if functions is None:
+        functions = extract_functions_from_code(content, filepath)
     function_names = [func['name'] for func in functions]
     
     # 分析每个函数中的调用
@@ -664,10 +629,8 @@ def analyze_calls_with_regex(content, filepath):
         func_lines = lines[start_line:end_line]
         func_content = '\n'.join(func_lines)
         
-        # 查找函数调用
-        # 匹配模式：函数名(参数)
-        call_pattern = r'(\w+)\s*\('
-        matches = re.findall(call_pattern, func_content)
+        # 查找函数调用：匹配 函数名(参数)
+        matches = _CALL_RE.findall(func_content)
         
         for match in matches:
             # 检查是否是已知的函数
@@ -693,39 +656,32 @@ def compute_coupling(project_dir):
     
     print(f"🔍 计算耦合度指标 - {len(files)} 个文件")
     
-    # 构建导入图
-    for f in tqdm(files, desc="分析导入关系"):
-        imports = parse_imports(f)
-        for imp in imports:
-            import_graph.add_edge(f, imp)
-    
-    # 构建调用图
-    for f in tqdm(files, desc="分析调用关系"):
-        try:
-            with open(f, "r", encoding="utf-8") as src:
-                content = src.read()
-            
-            # 根据文件类型选择分析方法
-            file_ext = os.path.splitext(f)[1].lower()
-            if file_ext == '.py':
-                tree = ast.parse(content)
-                analyzer = FunctionCallAnalyzer(f)
-                analyzer.visit(tree)
-                for caller, callee in analyzer.calls:
-                    call_graph.add_edge(f"{f}:{caller}", callee)
-            else:
-                # 对于其他语言，使用正则表达式分析
-                calls = analyze_calls_with_regex(content, f)
-                for caller, callee in calls:
-                    call_graph.add_edge(f"{f}:{caller}", callee)
-        except Exception:
-            continue
-    
-    # 计算每个文件的耦合度指标
+    # 导入/调用分析按文件并行，图构建在主进程串行完成
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        analysis_results = list(tqdm(executor.map(_process_file_for_coupling, files, chunksize=16),
+                                     total=len(files), desc="分析导入与调用关系"))
+
+    # 先收集边再一次性 add_edges_from，省去逐条 add_edge 的 Python 调用开销；
+    # 每文件的调用节点数顺手计数，替代后面对全图节点的 startswith 扫描
+    import_edges = []
+    call_edges = []
+    call_node_count = Counter()
+    for f, imports, calls in analysis_results:
+        import_edges.extend((f, imp) for imp in imports)
+        seen_callers = set()
+        for caller, callee in calls:
+            call_edges.append((f"{f}:{caller}", callee))
+            seen_callers.add(caller)
+        call_node_count[f] = len(seen_callers)
+    import_graph.add_edges_from(import_edges)
+    call_graph.add_edges_from(call_edges)
+    
+    # 计算每个文件的耦合度指标（度视图一次物化成 dict，避免逐文件查询）
+    import_out_deg = dict(import_graph.out_degree())
     results = {}
     for f in files:
-        import_deg = import_graph.out_degree(f)
-        call_deg = sum(1 for n in call_graph.nodes if n.startswith(f + ":"))
+        import_deg = import_out_deg.get(f, 0)
+        call_deg = call_node_count[f]
         coupling_score = round(import_deg * 0.4 + call_deg * 0.6, 3)
         
         results[f] = {
@@ -747,36 +703,49 @@ def analyze_coupling_diff(explicit_coupling, implicit_coupling, out_dir):
         implicit_coupling: 非显性架构耦合度数据
         out_dir: 输出目录
     """
-    # 转换为DataFrame
-    df_exp = pd.DataFrame([
-        {"file": f, **v, "view": "explicit"} for f, v in explicit_coupling.items()
-    ])
-    df_imp = pd.DataFrame([
-        {"file": f, **v, "view": "non_explicit"} for f, v in implicit_coupling.items()
-    ])
-    df = pd.concat([df_exp, df_imp], ignore_index=True)
-    
-    # 保存详细报告
+    metrics = ["import_coupling", "call_coupling", "coupling_score"]
+
+    # 指标直接装进 numpy 数组做统计，跳过逐行 dict → DataFrame 的装箱
+    def _metric_arrays(coupling):
+        return {
+            m: np.fromiter((v[m] for v in coupling.values()),
+                           dtype=np.float64, count=len(coupling))
+            for m in metrics
+        }
+
+    exp_arrays = _metric_arrays(explicit_coupling)
+    imp_arrays = _metric_arrays(implicit_coupling)
+    summary = {
+        "explicit": {m: exp_arrays[m].mean() if exp_arrays[m].size else 0.0 for m in metrics},
+        "non_explicit": {m: imp_arrays[m].mean() if imp_arrays[m].size else 0.0 for m in metrics},
+    }
+    
+    # 保存详细报告（pandas 仅用于 CSV 导出）
     report_csv = Path(out_dir) / "coupling_report.csv"
     ensure_dir(out_dir)
+    rows = [(f, v["import_coupling"], v["call_coupling"], v["coupling_score"], "explicit")
+            for f, v in explicit_coupling.items()]
+    rows += [(f, v["import_coupling"], v["call_coupling"], v["coupling_score"], "non_explicit")
+             for f, v in implicit_coupling.items()]
+    df = pd.DataFrame.from_records(
+        rows, columns=["file", "import_coupling", "call_coupling", "coupling_score", "view"])
+    df["view"] = pd.Categorical(df["view"], categories=["explicit", "non_explicit"])
     df.to_csv(report_csv, index=False, encoding="utf-8-sig")
     print(f"📊 耦合度报告已保存至: {report_csv}")
     
     # 计算平均值
-    metrics = ["import_coupling", "call_coupling", "coupling_score"]
-    summary = df.groupby("view")[metrics].mean()
     print("\n=== 平均耦合度对比 ===")
-    print(summary)
+    for view in ("explicit", "non_explicit"):
+        means = "  ".join(f"{m}={summary[view][m]:.3f}" for m in metrics)
+        print(f"{view}: {means}")
     
     # 统计检验
     print("\n=== 统计检验结果 ===")
     signif_dict = {}
     for m in metrics:
-        exp_values = df_exp[m].values
-        imp_values = df_imp[m].values
-        t_stat, p_val = ttest_ind(exp_values, imp_values, equal_var=False)
+        t_stat, p_val = ttest_ind(exp_arrays[m], imp_arrays[m], equal_var=False)
         signif_dict[m] = p_val
-        delta = summary.loc['non_explicit', m] - summary.loc['explicit', m]
+        delta = summary['non_explicit'][m] - summary['explicit'][m]
         print(f"{m}: Δ = {delta:.3f}, p-value = {p_val:.4f}")
     
     # 绘制对比图
@@ -784,14 +753,14 @@ def analyze_coupling_diff(explicit_coupling, implicit_coupling, out_dir):
     x = np.arange(len(metrics))
     bar_width = 0.35
     
-    plt.bar(x - bar_width/2, summary.loc["explicit"], bar_width, 
+    plt.bar(x - bar_width/2, [summary["explicit"][m] for m in metrics], bar_width, 
             label="显性架构", color='skyblue', alpha=0.8)
-    plt.bar(x + bar_width/2, summary.loc["non_explicit"], bar_width, 
+    plt.bar(x + bar_width/2, [summary["non_explicit"][m] for m in metrics], bar_width, 
             label="非显性架构", color='lightcoral', alpha=0.8)
     
     # 标注统计显著性
     for idx, m in enumerate(metrics):
-        delta = summary.loc["non_explicit", m] - summary.loc["explicit", m]
+        delta = summary["non_explicit"][m] - summary["explicit"][m]
         p_val = signif_dict[m]
         if p_val < 0.001:
             star = "***"
@@ -802,7 +771,7 @@ def analyze_coupling_diff(explicit_coupling, implicit_coupling, out_dir):
         else:
             star = "ns"
         
-        y_pos = max(summary.loc["explicit", m], summary.loc["non_explicit", m]) + 0.5
+        y_pos = max(summary["explicit"][m], summary["non_explicit"][m]) + 0.5
         plt.text(idx, y_pos, f"Δ={delta:.2f}\n{star}", 
                 ha='center', va='bottom', fontsize=10, fontweight='bold')
     
@@ -822,33 +791,58 @@ def analyze_coupling_diff(explicit_coupling, implicit_coupling, out_dir):
 
 # ========= 5️⃣ 样本处理与划分 ==========
 def attach_coupling(samples, coupling_dict):
-    """为样本附加耦合度信息"""
+    """为样本附加耦合度信息（流式：逐个处理并产出）"""
     for s in samples:
         f = s["file"]
         if f in coupling_dict:
             s["coupling"] = coupling_dict[f]
         else:
             s["coupling"] = {"import_coupling": 0, "call_coupling": 0, "coupling_score": 0}
-    return samples
+        yield s
+
+
+def _dumps_sample(obj):
+    """序列化单个样本为 JSON 字节串：优先 orjson，未安装时回退 stdlib json"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
 
 
 def save_and_split(samples, out_prefix):
-    """保存样本并划分训练/验证集"""
+    """
+    流式写出样本（JSON Lines，每行一个样本）并划分训练/验证集。
+    全量样本只在磁盘上存在一份，划分时按记录偏移回读，
+    不在内存中保留第二份拷贝。
+    
+    Returns:
+        int: 样本总数
+    """
     ensure_dir(os.path.dirname(out_prefix))
     
-    # 保存完整样本
-    with open(out_prefix + ".json", "w", encoding="utf-8") as f:
-        json.dump(samples, f, indent=2, ensure_ascii=False)
+    # 第一遍：边消费生成器边写全量 JSONL，记录每条样本的文件偏移
+    jsonl_path = out_prefix + ".jsonl"
+    offsets = []
+    with open(jsonl_path, "wb") as f:
+        for s in samples:
+            offsets.append(f.tell())
+            f.write(_dumps_sample(s) + b"\n")
+    count = len(offsets)
     
-    # 划分训练/验证集
-    train, val = train_test_split(samples, test_size=0.2, random_state=42)
+    if count < 2:
+        print(f"⚠️ 样本过少（{count} 个），跳过训练/验证集划分")
+        return count
     
-    with open(out_prefix + "_train.json", "w", encoding="utf-8") as f:
-        json.dump(train, f, indent=2, ensure_ascii=False)
-    with open(out_prefix + "_val.json", "w", encoding="utf-8") as f:
-        json.dump(val, f, indent=2, ensure_ascii=False)
+    # 第二遍：只划分索引，按偏移 seek 回读写出两个子集
+    train_idx, val_idx = train_test_split(range(count), test_size=0.2, random_state=42)
+    with open(jsonl_path, "rb") as full:
+        for idx_list, suffix in ((train_idx, "_train.jsonl"), (val_idx, "_val.jsonl")):
+            with open(out_prefix + suffix, "wb") as out:
+                for i in idx_list:
+                    full.seek(offsets[i])
+                    out.write(full.readline())
     
-    print(f"✅ 样本划分完成: 训练集 {len(train)} / 验证集 {len(val)}")
+    print(f"✅ 样本划分完成: 训练集 {len(train_idx)} / 验证集 {len(val_idx)}")
+    return count
 
 
 # ========= 主流程 ==========
@@ -882,12 +876,12 @@ def main(src_dir, out_dir):
     exp_samples = attach_coupling(exp_samples, exp_coupling)
     imp_samples = attach_coupling(imp_samples, imp_coupling)
     
-    save_and_split(exp_samples, f"{out_dir}/explicit_samples")
-    save_and_split(imp_samples, f"{out_dir}/non_explicit_samples")
+    exp_count = save_and_split(exp_samples, f"{out_dir}/explicit_samples")
+    imp_count = save_and_split(imp_samples, f"{out_dir}/non_explicit_samples")
     
     print("🎯 数据构建流程完成！")
-    print(f"📊 显性架构样本: {len(exp_samples)} 个")
-    print(f"📊 非显性架构样本: {len(imp_samples)} 个")
+    print(f"📊 显性架构样本: {exp_count} 个")
+    print(f"📊 非显性架构样本: {imp_count} 个")
 
 
 if __name__ == "__main__":
@@ -19,6 +19,15 @@ import re
 import os
 from typing import List, Dict, Tuple
 
+# 预编译解析模式：这些函数按文件循环调用，编译成本只付一次
+_IMPORT_RE = re.compile(r'import\s+(?:static\s+)?([a-zA-Z_][a-zA-Z0-9_.]*)\s*;')
+_PACKAGE_RE = re.compile(r'package\s+([a-zA-Z_][a-zA-Z0-9_.]*)\s*;')
+_METHOD_CALL_RE = re.compile(r'(\w+)\s*\.\s*(\w+)\s*\(')
+_DIRECT_CALL_RE = re.compile(r'(?:^|\s|;|{|})\s*(\w+)\s*\(')
+_CONSTRUCTOR_RE = re.compile(r'new\s+([a-zA-Z_][a-zA-Z0-9_.]*)\s*\(')
+_METHOD_DEF_RE = re.compile(r'(?:public|private|protected|static|\s)*\s*(?:final|abstract|\s)*\s*(?:void|\w+)\s+(\w+)\s*\(')
+_CONSTRUCTOR_DEF_RE = re.compile(r'(?:public|private|protected)\s+([A-Z][a-zA-Z0-9_]*)\s*\(')
+
 def parse_java_imports(filepath: str) -> List[str]:
     """解析Java import语句"""
     imports = []
@@ -27,14 +36,10 @@ def parse_java_imports(filepath: str) -> List[str]:
             content = f.read()
         
         # 匹配 import 语句
-        import_pattern = r'import\s+(?:static\s+)?([a-zA-Z_][a-zA-Z0-9_.]*)\s*;'
-        matches = re.findall(import_pattern, content)
-        imports.extend(matches)
+        imports.extend(_IMPORT_RE.findall(content))
         
         # 匹配 package 语句
-        package_pattern = r'package\s+([a-zA-Z_][a-zA-Z0-9_.]*)\s*;'
-        package_matches = re.findall(package_pattern, content)
-        imports.extend(package_matches)
+        imports.extend(_PACKAGE_RE.findall(content))
         
     except Exception as e:
         print(f"⚠️ 解析import失败: {filepath} - {e}")
@@ -49,22 +54,16 @@ def parse_java_method_calls(filepath: str) -> List[Tuple[str, str]]:
             content = f.read()
         
         # 匹配方法调用: object.method() 或 method()
-        method_call_pattern = r'(\w+)\s*\.\s*(\w+)\s*\('
-        matches = re.findall(method_call_pattern, content)
-        for obj, method in matches:
+        for obj, method in _METHOD_CALL_RE.findall(content):
             calls.append((f"{obj}.{method}", method))
         
         # 匹配直接方法调用: method()
-        direct_call_pattern = r'(?:^|\s|;|{|})\s*(\w+)\s*\('
-        direct_matches = re.findall(direct_call_pattern, content)
-        for method in direct_matches:
+        for method in _DIRECT_CALL_RE.findall(content):
             if method not in ['if', 'for', 'while', 'switch', 'catch', 'try', 'new', 'return']:
                 calls.append((method, method))
         
         # 匹配构造函数调用: new ClassName()
-        constructor_pattern = r'new\s+([a-zA-Z_][a-zA-Z0-9_.]*)\s*\('
-        constructor_matches = re.findall(constructor_pattern, content)
-        for constructor in constructor_matches:
+        for constructor in _CONSTRUCTOR_RE.findall(content):
             calls.append((f"new {constructor}", constructor))
         
     except Exception as e:
@@ -80,14 +79,10 @@ def extract_java_methods(filepath: str) -> List[str]:
             content = f.read()
         
         # 匹配方法定义
-        method_pattern = r'(?:public|private|protected|static|\s)*\s*(?:final|abstract|\s)*\s*(?:void|\w+)\s+(\w+)\s*\('
-        matches = re.findall(method_pattern, content)
-        methods.extend(matches)
+        methods.extend(_METHOD_DEF_RE.findall(content))
         
         # 匹配构造函数
-        constructor_pattern = r'(?:public|private|protected)\s+([A-Z][a-zA-Z0-9_]*)\s*\('
-        constructor_matches = re.findall(constructor_pattern, content)
-        methods.extend(constructor_matches)
+        methods.extend(_CONSTRUCTOR_DEF_RE.findall(content))
         
     except Exception as e:
         print(f"⚠️ 提取方法定义失败: {filepath} - {e}")
@@ -28,14 +28,15 @@ parsers package
 """
 
 from typing import List, Tuple, Optional, Dict, Type
-from .java_ast_parser import JavaASTParser, create_java_parser
-from .python_ast_parser import PythonASTParser, create_python_parser
+from .java_ast_parser import JavaASTParser, create_java_parser as _create_java_parser
+from .python_ast_parser import PythonASTParser, create_python_parser as _create_python_parser
 
 
 class ParserFactory:
     """解析器工厂"""
     
     def __init__(self):
+        self._instances: Dict[str, object] = {}
         self._parsers: Dict[str, Type] = {
             'java': JavaASTParser,
             'py': PythonASTParser,  # Python解析器已实现
@@ -49,7 +50,10 @@ class ParserFactory:
         }
     
     def get_parser(self, language: str):
-        """获取指定语言的解析器"""
+        """获取指定语言的解析器（同一语言复用单例，避免重复初始化）"""
+        if language in self._instances:
+            return self._instances[language]
+        
         if language not in self._parsers:
             raise ValueError(f"不支持的语言: {language}")
         
@@ -57,11 +61,14 @@ class ParserFactory:
         if parser_class is None:
             raise NotImplementedError(f"{language} 解析器尚未实现")
         
-        return parser_class()
+        parser = parser_class()
+        self._instances[language] = parser
+        return parser
     
     def register_parser(self, language: str, parser_class: Type):
         """注册新的解析器"""
         self._parsers[language] = parser_class
+        self._instances.pop(language, None)
     
     def get_supported_languages(self) -> List[str]:
         """获取支持的语言列表"""
@@ -85,12 +92,12 @@ def get_supported_languages() -> List[str]:
 # 向后兼容的便捷函数
 def create_java_parser():
     """创建Java解析器（向后兼容）"""
-    return create_java_parser()
+    return _create_java_parser()
 
 
 def create_python_parser():
     """创建Python解析器（向后兼容）"""
-    return create_python_parser()
+    return _create_python_parser()
 
 
 __all__ = [
@@ -21,28 +21,186 @@ Java AST解析器
 import re
 import os
 import ast
-from typing import List, Dict, Tuple, Optional, Set
+from collections import namedtuple
+import mmap
+import pickle
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from bisect import bisect_left
+from typing import Callable, List, Dict, Tuple, Optional, Set
 from pathlib import Path
 
+try:
+    import re2 as _re2  # google-re2：线性时间匹配，病态输入不回溯爆炸
+except ImportError:
+    _re2 = None
+
+
+def _compile_linear(pattern: str, flags: int = 0):
+    """嵌套可选组的模式优先用 RE2 编译；语法不支持或未安装则回退 re"""
+    if _re2 is not None:
+        try:
+            return _re2.compile(pattern, flags)
+        except Exception:
+            pass
+    return re.compile(pattern, flags)
+
+
+# 模块级预编译正则：import 时编译一次，
+# 避免每次调用 re.search/finditer 的模式缓存查找与哈希
+# 签名正则带命名组：修饰符/返回类型/参数在主匹配里一次捕获，
+# 不再对每个匹配文本二次 search 小正则
+# 方法与构造函数共用一条签名正则：ret 组缺失的分支即构造函数
+# （构造函数名保持大写开头约束），一遍 finditer 同时产出两类记录，
+# 也消除了方法签名尾部被构造正则重复命中的假记录
+_SIGNATURE_RE = _compile_linear(r'(?P<mods>(?:public|private|protected|package-private)?\s*(?:static|final|abstract|synchronized|native|strictfp|default)?)\s*(?:<[^>]*>)?\s*(?:(?P<cname>[A-Z][a-zA-Z0-9_]*)\s*\((?P<cparams>[^)]*)\)|(?P<ret>void|\w+(?:<[^>]*>)?(?:\s*\[\])*)\s+(?P<name>\w+)\s*\((?P<params>[^)]*)\))\s*(?:throws\s+[^{;]+)?\s*[;{]', re.MULTILINE)
+_FIELD_RE = _compile_linear(r'(?P<mods>(?:public|private|protected|package-private)?\s*(?:static|final|transient|volatile)?)\s*(?:<[^>]*>)?\s*(?P<type>void|\w+(?:<[^>]*>)?(?:\s*\[\])*)\s+(?P<name>\w+)\s*(?:=\s*[^;]+)?\s*;', re.MULTILINE)
+
+# 注释与字符串字面量的单遍识别：文本块/字符串/字符/行注释/块注释。
+# 交给 C 实现的正则引擎一趟扫完，等价于逐字符状态机但快得多
+_NOISE_RE = re.compile(
+    r'"""(?:[^"\\]|\\.|"(?!""))*"""'
+    r'|"(?:[^"\\\n]|\\.)*"'
+    r"|'(?:[^'\\\n]|\\.)*'"
+    r'|//[^\n]*'
+    r'|/\*.*?\*/',
+    re.DOTALL)
+
+
+def _blank_noise(match: 're.Match') -> str:
+    """把注释/字符串替换为等长空白，保留换行以维持行号与偏移"""
+    return '\n'.join(' ' * len(part) for part in match.group(0).split('\n'))
+
+
+def _sanitize(content: str) -> str:
+    """抹掉注释与字符串内容，杜绝其中的 class/import 等被误匹配"""
+    if '"' not in content and '/' not in content and "'" not in content:
+        return content
+    return _NOISE_RE.sub(_blank_noise, content)
+
+
+# 仅保留真正需要上下文的现代特性正则，其余用字面量子串判定
+_SWITCH_EXPR_RE = re.compile(r'switch\s*\([^)]+\)\s*\{[^}]*\}')
+_VAR_RE = re.compile(r'var\s+\w+\s*=')
+_INSTANCEOF_PATTERN_RE = re.compile(r'instanceof\s+\w+\s+\w+')
+
+# 声明类构造的合并扫描：package/import/类定义/注解 各为一个命名分支，
+# 同一位置按分支顺序取首个匹配，全文只扫一遍。
+# 旧的 sealed/record 专用类模式是通用类分支的子集，合并后同一
+# 定义不再产生重复记录；@interface 也不再被注解分支误报一次。
+_DECL_RE = re.compile(
+    r'package\s+(?P<pkg_name>[a-zA-Z_][a-zA-Z0-9_.]*)\s*;'
+    r'|import\s+(?P<imp_static>static\s+)?(?P<imp_name>[a-zA-Z_][a-zA-Z0-9_.]*)\s*;'
+    r'|(?P<cls>(?:public|private|protected|package-private)?\s*(?:static|final|abstract|sealed)?\s*(?:class|interface|enum|record|@interface)\s+(?P<cls_name>\w+))'
+    r'|(?P<ann>@(?P<ann_name>\w+)(?:\([^)]*\))?)',
+    re.MULTILINE)
+
+# 方法调用的合并扫描：instance/new/direct 三个分支一遍完成，
+# obj.method( 不再被裸调用分支重复记一次
+_CALL_RE = re.compile(
+    r'(?P<ic_obj>\w+)\s*\.\s*(?P<ic_meth>\w+)\s*\('
+    r'|new\s+(?P<ctor>[a-zA-Z_][a-zA-Z0-9_.]*)\s*\('
+    r'|(?P<direct>\w+)\s*\(',
+    re.MULTILINE)
+
+# 提取记录用 namedtuple 而非 dict：百万级记录时单条 ~230B 的
+# dict 开销是主要内存项，namedtuple 固定槽位且属性访问更快
+ClassInfo = namedtuple('ClassInfo', ('name', 'line', 'modifiers', 'type'))
+MethodInfo = namedtuple('MethodInfo',
+                        ('name', 'line', 'modifiers', 'parameters',
+                         'return_type', 'is_constructor'))
+FieldInfo = namedtuple('FieldInfo', ('name', 'line', 'modifiers', 'type'))
+AnnotationInfo = namedtuple('AnnotationInfo', ('name', 'line', 'full_match'))
+CallInfo = namedtuple('CallInfo', ('method', 'line', 'type', 'object'),
+                      defaults=(None,))
+
+# 控制结构关键字：\b 整词边界，一遍 finditer 统计全文出现次数
+_CONTROL_RE = re.compile(r'\b(?:if|else|for|while|do|switch|try|catch|finally|synchronized|assert)\b')
+
+# 修饰符全集：访问修饰符 + 方法/字段关键字，取交集用
+_MODIFIER_SET = frozenset({
+    'public', 'private', 'protected', 'package-private',
+    'static', 'final', 'abstract', 'synchronized', 'native',
+    'strictfp', 'default', 'transient', 'volatile',
+})
+
+# Java关键字分类：解析器无状态，关键字表提到模块级共享，
+# 实例化不再重建这些集合
+ACCESS_MODIFIERS = frozenset({'public', 'private', 'protected', 'package-private'})
+CLASS_KEYWORDS = frozenset({'class', 'interface', 'enum', 'record', '@interface', 'sealed'})
+METHOD_KEYWORDS = frozenset({'static', 'final', 'abstract', 'synchronized', 'native', 'strictfp', 'default', 'transient', 'volatile'})
+CONTROL_STRUCTURES = frozenset({'if', 'else', 'for', 'while', 'do', 'switch', 'try', 'catch', 'finally', 'synchronized', 'assert'})
+ANNOTATION_KEYWORDS = frozenset({'@Override', '@Deprecated', '@SuppressWarnings', '@FunctionalInterface', '@SafeVarargs', '@Target', '@Retention'})
+TYPE_KEYWORDS = frozenset({'void', 'int', 'long', 'short', 'byte', 'char', 'float', 'double', 'boolean', 'String', 'Object'})
+
+# 现代Java特性
+MODERN_FEATURES = frozenset({
+    'record', 'sealed', 'permits', 'switch', 'yield', 'var', 'instanceof',
+    'text blocks', 'pattern matching', 'switch expressions'
+})
+
+
+
+# 超过该大小的文件走分块解析，峰值内存从 O(文件) 降为 O(块)
+_STREAM_THRESHOLD = 32 << 20
+_STREAM_CHUNK = 4 << 20
+_STREAM_OVERLAP = 4096
+
+
+def _iter_chunks(filepath: str, chunk: int = _STREAM_CHUNK,
+                 overlap: int = _STREAM_OVERLAP):
+    """
+    行对齐的分块读取，yield (起始行偏移, 核心文本, 含重叠尾巴的文本)。
+    重叠尾巴只用来捕捉跨块边界的多行结构；计数类指标只看核心文本，
+    避免重叠区域被统计两次。
+    """
+    with open(filepath, 'rb') as f:
+        base_line = 0
+        tail = b''
+        while True:
+            block = f.read(chunk)
+            if not block:
+                if tail:
+                    text = tail.decode('utf-8', errors='replace')
+                    yield base_line, text, text
+                return
+            buf = tail + block
+            cut = buf.rfind(b'\n')
+            if cut == -1:
+                tail = buf
+                continue
+            core = buf[:cut + 1]
+            tail = buf[cut + 1:]
+            # 窥视下一块开头 overlap 字节内的整行作为重叠尾巴
+            pos = f.tell()
+            extra = f.read(overlap)
+            f.seek(pos)
+            ext_cut = extra.rfind(b'\n')
+            ext = extra[:ext_cut + 1] if ext_cut != -1 else b''
+            core_text = core.decode('utf-8', errors='replace')
+            overlap_text = (tail + ext).decode('utf-8', errors='replace')
+            yield base_line, core_text, core_text + overlap_text
+            base_line += core_text.count('\n')
+
+
+def _newline_offsets(content: str) -> List[int]:
+    """一次性收集全部换行符偏移，供行号二分查找使用"""
+    offsets = []
+    pos = content.find('\n')
+    while pos != -1:
+        offsets.append(pos)
+        pos = content.find('\n', pos + 1)
+    return offsets
+
+
+def _line_of(offset: int, newline_offsets: List[int]) -> int:
+    """由字符偏移求行号：统计偏移之前的换行数，O(log N)"""
+    return bisect_left(newline_offsets, offset) + 1
+
 
 class JavaASTParser:
-    """Java AST解析器"""
-    
-    def __init__(self):
-        # Java关键字分类
-        self.access_modifiers = {'public', 'private', 'protected', 'package-private'}
-        self.class_keywords = {'class', 'interface', 'enum', 'record', '@interface', 'sealed'}
-        self.method_keywords = {'static', 'final', 'abstract', 'synchronized', 'native', 'strictfp', 'default', 'transient', 'volatile'}
-        self.control_structures = {'if', 'else', 'for', 'while', 'do', 'switch', 'try', 'catch', 'finally', 'synchronized', 'assert'}
-        self.annotation_keywords = {'@Override', '@Deprecated', '@SuppressWarnings', '@FunctionalInterface', '@SafeVarargs', '@Target', '@Retention'}
-        self.type_keywords = {'void', 'int', 'long', 'short', 'byte', 'char', 'float', 'double', 'boolean', 'String', 'Object'}
-        
-        # 现代Java特性
-        self.modern_features = {
-            'record', 'sealed', 'permits', 'switch', 'yield', 'var', 'instanceof',
-            'text blocks', 'pattern matching', 'switch expressions'
-        }
-    
+    """Java AST解析器（无实例状态，可安全共享）"""
+
     def parse_file(self, filepath: str) -> Dict:
         """
         解析Java文件，返回完整的AST信息
@@ -54,277 +212,357 @@ class JavaASTParser:
             包含解析结果的字典
         """
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # mmap 由操作系统按需换页，免去 read() 的中间 bytes 拷贝；
+            # 空文件不可 mmap，单独短路；超大文件分块流式解析
+            with open(filepath, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return self._parse_content('', filepath)
+                if size > _STREAM_THRESHOLD:
+                    return self._parse_streaming(filepath)
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    content = mm[:].decode('utf-8')
             
             return self._parse_content(content, filepath)
             
         except Exception as e:
             print(f"⚠️ 解析Java文件失败: {filepath} - {e}")
             return self._create_empty_result()
+
+    def _parse_streaming(self, filepath: str) -> Dict:
+        """
+        分块解析超大（生成）Java 文件：逐窗口提取后按绝对行号合并，
+        重叠区域出现两次的记录以 (类别, 行号, 名称) 去重。
+        """
+        package: Optional[str] = None
+        imports: List[str] = []
+        classes: List[ClassInfo] = []
+        methods: List[MethodInfo] = []
+        fields: List[FieldInfo] = []
+        annotations: List[AnnotationInfo] = []
+        calls: List[CallInfo] = []
+        constructors: List[MethodInfo] = []
+        features: List[str] = []
+        seen: Set[tuple] = set()
+        line_count = 0
+        char_count = 0
+        control = 0
+        
+        def _merge(target, records, category, name_key, base_line):
+            for rec in records:
+                rec = rec._replace(line=rec.line + base_line)
+                key = (category, rec.line, getattr(rec, name_key))
+                if key not in seen:
+                    seen.add(key)
+                    target.append(rec)
+        
+        for base_line, core, extended in _iter_chunks(filepath):
+            core_code = _sanitize(core)
+            line_count += core.count('\n')
+            char_count += len(core)
+            control += sum(1 for _ in _CONTROL_RE.finditer(core_code))
+            
+            code = _sanitize(extended)
+            nlo = _newline_offsets(extended)
+            pkg, imps, cls, anns = self._scan_declarations(code, nlo)
+            if package is None:
+                package = pkg
+            for imp in imps:
+                if ('import', imp) not in seen:
+                    seen.add(('import', imp))
+                    imports.append(imp)
+            _merge(classes, cls, 'class', 'name', base_line)
+            _merge(annotations, anns, 'annotation', 'name', base_line)
+            meths, ctors = self._extract_signatures(code, nlo)
+            _merge(methods, meths, 'method', 'name', base_line)
+            _merge(constructors, ctors, 'ctor', 'name', base_line)
+            _merge(fields, self._extract_fields(code, nlo), 'field', 'name', base_line)
+            _merge(calls, self._extract_method_calls(code, nlo), 'call', 'method', base_line)
+            for feature in self._detect_modern_features(extended):
+                if feature not in features:
+                    features.append(feature)
+        
+        return {
+            'file': filepath,
+            'package': package,
+            'imports': imports,
+            'classes': classes,
+            'methods': methods,
+            'fields': fields,
+            'annotations': annotations,
+            'method_calls': calls,
+            'constructors': constructors,
+            'modern_features': features,
+            'complexity_metrics': {
+                'line_count': line_count + 1,
+                'char_count': char_count,
+                'method_count': len(methods),
+                'class_count': len(classes),
+                'control_structures': control,
+                'cyclomatic_complexity': control + 1
+            }
+        }
     
     def _parse_content(self, content: str, filepath: str) -> Dict:
         """解析Java内容"""
-        lines = content.split('\n')
+        # 换行偏移表只建一次；各提取器用二分代替
+        # content[:start].count('\n') 的逐字符重扫，
+        # 行数也由它直接得出，不再 split 出整份行列表
+        nlo = _newline_offsets(content)
+        # 结构提取在抹掉注释/字符串的副本上进行（等长，行号不变）；
+        # 现代特性检测仍看原文（文本块本身就是字符串语法）
+        code = _sanitize(content)
+        
+        # 声明类信息一遍扫出
+        package, imports, classes, annotations = self._scan_declarations(code, nlo)
+        
+        # 无任何类型定义的文件（生成桩、资源类文件）跳过昂贵的
+        # 签名/调用扫描，返回部分结果即可
+        if not classes:
+            return {
+                'file': filepath,
+                'package': package,
+                'imports': imports,
+                'classes': [],
+                'methods': [],
+                'fields': [],
+                'annotations': annotations,
+                'method_calls': [],
+                'constructors': [],
+                'modern_features': self._detect_modern_features(content),
+                'complexity_metrics': self._calculate_complexity_metrics(
+                    code, len(nlo) + 1, 0, 0)
+            }
+        
+        methods, constructors = self._extract_signatures(code, nlo)
         
         # 基础信息
         result = {
             'file': filepath,
-            'package': self._extract_package(content),
-            'imports': self._extract_imports(content),
-            'classes': self._extract_classes(content, lines),
-            'methods': self._extract_methods(content, lines),
-            'fields': self._extract_fields(content, lines),
-            'annotations': self._extract_annotations(content),
-            'method_calls': self._extract_method_calls(content),
-            'constructors': self._extract_constructors(content, lines),
+            'package': package,
+            'imports': imports,
+            'classes': classes,
+            'methods': methods,
+            'fields': self._extract_fields(code, nlo),
+            'annotations': annotations,
+            'method_calls': self._extract_method_calls(code, nlo),
+            'constructors': constructors,
             'modern_features': self._detect_modern_features(content),
-            'complexity_metrics': self._calculate_complexity_metrics(content, lines)
+            'complexity_metrics': self._calculate_complexity_metrics(
+                code, len(nlo) + 1, len(methods), len(classes))
         }
         
         return result
-    
-    def _extract_package(self, content: str) -> Optional[str]:
-        """提取package声明"""
-        package_pattern = r'package\s+([a-zA-Z_][a-zA-Z0-9_.]*)\s*;'
-        match = re.search(package_pattern, content)
-        return match.group(1) if match else None
-    
-    def _extract_imports(self, content: str) -> List[str]:
-        """提取import语句"""
-        imports = []
-        
-        # 标准import
-        import_pattern = r'import\s+(?:static\s+)?([a-zA-Z_][a-zA-Z0-9_.]*)\s*;'
-        matches = re.findall(import_pattern, content)
-        imports.extend(matches)
-        
-        # 静态import
-        static_import_pattern = r'import\s+static\s+([a-zA-Z_][a-zA-Z0-9_.]*)\s*;'
-        static_matches = re.findall(static_import_pattern, content)
-        imports.extend([f"static {imp}" for imp in static_matches])
-        
-        return imports
-    
-    def _extract_classes(self, content: str, lines: List[str]) -> List[Dict]:
-        """提取类定义"""
-        classes = []
-        
-        # 匹配类定义（包括record、enum、interface等）
-        class_patterns = [
-            r'(?:public|private|protected|package-private)?\s*(?:static|final|abstract|sealed)?\s*(?:class|interface|enum|record|@interface)\s+(\w+)',
-            r'sealed\s+(?:class|interface)\s+(\w+)\s+permits',
-            r'record\s+(\w+)\s*\('
-        ]
-        
-        for pattern in class_patterns:
-            matches = re.finditer(pattern, content, re.MULTILINE)
-            for match in matches:
-                class_name = match.group(1)
-                line_num = content[:match.start()].count('\n') + 1
-                
-                # 提取类修饰符
-                modifiers = self._extract_modifiers(match.group(0))
-                
-                classes.append({
-                    'name': class_name,
-                    'line': line_num,
-                    'modifiers': modifiers,
-                    'type': self._get_class_type(match.group(0))
-                })
-        
-        return classes
-    
-    def _extract_methods(self, content: str, lines: List[str]) -> List[Dict]:
-        """提取方法定义"""
-        methods = []
-        
-        # 更复杂的方法匹配模式
-        method_pattern = r'(?:public|private|protected|package-private)?\s*(?:static|final|abstract|synchronized|native|strictfp|default)?\s*(?:<[^>]*>)?\s*(?:void|\w+(?:<[^>]*>)?(?:\s*\[\])*)\s+(\w+)\s*\([^)]*\)\s*(?:throws\s+[^{;]+)?\s*[;{]'
+
+    def reparse(self, prev_result: Dict, old_content: str, new_content: str,
+                edit_range: Tuple[int, int]) -> Dict:
+        """
+        增量重解析：只对编辑波及的行窗口重跑昂贵的签名类扫描，
+        窗口外的记录按行号平移后直接复用。
         
-        matches = re.finditer(method_pattern, content, re.MULTILINE)
-        for match in matches:
-            method_name = match.group(1)
-            line_num = content[:match.start()].count('\n') + 1
-            
-            # 提取方法修饰符
-            modifiers = self._extract_modifiers(match.group(0))
-            
-            # 提取参数
-            params = self._extract_method_parameters(match.group(0))
-            
-            # 提取返回类型
-            return_type = self._extract_return_type(match.group(0))
+        Args:
+            prev_result: 上一次 parse/reparse 的结果
+            old_content: 编辑前的完整内容
+            new_content: 编辑后的完整内容
+            edit_range: 旧内容中被替换区间的字符偏移 [start, end)
             
-            methods.append({
-                'name': method_name,
-                'line': line_num,
-                'modifiers': modifiers,
-                'parameters': params,
-                'return_type': return_type,
-                'is_constructor': False
-            })
-        
-        return methods
-    
-    def _extract_constructors(self, content: str, lines: List[str]) -> List[Dict]:
-        """提取构造函数定义"""
-        constructors = []
-        
-        # 构造函数模式
-        constructor_pattern = r'(?:public|private|protected|package-private)?\s*([A-Z][a-zA-Z0-9_]*)\s*\([^)]*\)\s*(?:throws\s+[^{;]+)?\s*[;{]'
+        Returns:
+            与 _parse_content 同构的结果字典
+        """
+        start, end = edit_range
+        # 编辑过半个文件时增量无利可图，直接全量解析
+        if not prev_result or (end - start) * 2 > len(old_content):
+            return self._parse_content(new_content, prev_result.get('file', ''))
+        
+        old_nlo = _newline_offsets(old_content)
+        nlo = _newline_offsets(new_content)
+        line_delta = len(nlo) - len(old_nlo)
+        
+        # 受影响的旧行窗口，前后各扩一行容纳跨行结构
+        w_first = max(1, _line_of(start, old_nlo) - 1)
+        w_last_old = min(len(old_nlo) + 1, _line_of(end, old_nlo) + 1)
+        w_last_new = w_last_old + line_delta
+        
+        code = _sanitize(new_content)
+        # 声明类信息本就是单遍廉价扫描，直接全量重算
+        package, imports, classes, annotations = self._scan_declarations(code, nlo)
+        
+        # 新内容中的窗口文本（含行首到行尾）
+        win_start = nlo[w_first - 2] + 1 if w_first >= 2 else 0
+        win_end = nlo[w_last_new - 1] + 1 if 0 <= w_last_new - 1 < len(nlo) else len(code)
+        window = code[win_start:win_end]
+        win_nlo = _newline_offsets(window)
+        base = w_first - 1
+        
+        def _merge(prev_entries, fresh_entries):
+            merged = []
+            for rec in prev_entries:
+                if rec.line < w_first:
+                    merged.append(rec)
+                elif rec.line > w_last_old:
+                    merged.append(rec._replace(line=rec.line + line_delta))
+            for rec in fresh_entries:
+                merged.append(rec._replace(line=rec.line + base))
+            merged.sort(key=lambda r: r.line)
+            return merged
+        
+        win_methods, win_ctors = self._extract_signatures(window, win_nlo)
+        result = {
+            'file': prev_result.get('file', ''),
+            'package': package,
+            'imports': imports,
+            'classes': classes,
+            'methods': _merge(prev_result.get('methods', []), win_methods),
+            'fields': _merge(prev_result.get('fields', []),
+                             self._extract_fields(window, win_nlo)),
+            'annotations': annotations,
+            'method_calls': _merge(prev_result.get('method_calls', []),
+                                   self._extract_method_calls(window, win_nlo)),
+            'constructors': _merge(prev_result.get('constructors', []), win_ctors),
+            'modern_features': self._detect_modern_features(new_content),
+        }
+        result['complexity_metrics'] = self._calculate_complexity_metrics(
+            code, new_content.count('\n') + 1, len(result['methods']), len(result['classes']))
         
-        matches = re.finditer(constructor_pattern, content, re.MULTILINE)
-        for match in matches:
-            constructor_name = match.group(1)
-            line_num = content[:match.start()].count('\n') + 1
-            
-            # 提取构造函数修饰符
-            modifiers = self._extract_modifiers(match.group(0))
-            
-            # 提取参数
-            params = self._extract_method_parameters(match.group(0))
-            
-            constructors.append({
-                'name': constructor_name,
-                'line': line_num,
-                'modifiers': modifiers,
-                'parameters': params,
-                'is_constructor': True
-            })
-        
-        return constructors
+        return result
     
-    def _extract_fields(self, content: str, lines: List[str]) -> List[Dict]:
+    def _scan_declarations(self, content: str, nlo: List[int]) -> Tuple[Optional[str], List[str], List[ClassInfo], List[AnnotationInfo]]:
+        """单遍合并扫描 package/import/类定义/注解"""
+        package: Optional[str] = None
+        imports: List[str] = []
+        classes: List[ClassInfo] = []
+        annotations: List[AnnotationInfo] = []
+        
+        for match in _DECL_RE.finditer(content):
+            if match.group('imp_name') is not None:
+                name = match.group('imp_name')
+                imports.append(f"static {name}" if match.group('imp_static') else name)
+            elif match.group('cls') is not None:
+                classes.append(ClassInfo(
+                    name=match.group('cls_name'),
+                    line=_line_of(match.start(), nlo),
+                    modifiers=self._extract_modifiers(match.group('cls')),
+                    type=self._get_class_type(match.group('cls'))))
+            elif match.group('ann') is not None:
+                annotations.append(AnnotationInfo(
+                    name=match.group('ann_name'),
+                    line=_line_of(match.start(), nlo),
+                    full_match=match.group('ann')))
+            elif package is None:
+                package = match.group('pkg_name')
+        
+        return package, imports, classes, annotations
+
+    def _extract_signatures(self, content: str,
+                            nlo: List[int]) -> Tuple[List[MethodInfo], List[MethodInfo]]:
+        """一遍扫描同时提取方法与构造函数定义"""
+        methods: List[MethodInfo] = []
+        constructors: List[MethodInfo] = []
+        
+        for match in _SIGNATURE_RE.finditer(content):
+            ret = match.group('ret')
+            is_ctor = ret is None
+            name_group = 'cname' if is_ctor else 'name'
+            name = match.group(name_group)
+            modifiers = self._extract_modifiers(match.group('mods'))
+            # 'public A(...)' 这类签名从修饰符前起匹配时 ret 会吃掉
+            # 访问修饰符：ret 落在修饰符集合且名字大写开头的按构造函数归类
+            if not is_ctor and ret in _MODIFIER_SET and name[:1].isupper():
+                is_ctor = True
+                modifiers = modifiers + [ret]
+                ret = None
+            # 行号锚在名字上：匹配起点可能吞掉上一行行尾的空白，
+            # 全量解析与窗口重解析会因此差一行
+            info = MethodInfo(
+                name=name,
+                line=_line_of(match.start(name_group), nlo),
+                modifiers=modifiers,
+                parameters=self._split_parameters(
+                    match.group('cparams') if match.group('ret') is None
+                    else match.group('params')),
+                return_type=ret,
+                is_constructor=is_ctor)
+            (constructors if is_ctor else methods).append(info)
+        
+        return methods, constructors
+
+    def _extract_fields(self, content: str, nlo: List[int]) -> List[FieldInfo]:
         """提取字段定义"""
         fields = []
         
-        # 字段模式
-        field_pattern = r'(?:public|private|protected|package-private)?\s*(?:static|final|transient|volatile)?\s*(?:<[^>]*>)?\s*(?:void|\w+(?:<[^>]*>)?(?:\s*\[\])*)\s+(\w+)\s*(?:=\s*[^;]+)?\s*;'
-        
-        matches = re.finditer(field_pattern, content, re.MULTILINE)
-        for match in matches:
-            field_name = match.group(1)
-            line_num = content[:match.start()].count('\n') + 1
-            
-            # 提取字段修饰符
-            modifiers = self._extract_modifiers(match.group(0))
-            
-            # 提取字段类型
-            field_type = self._extract_field_type(match.group(0))
-            
-            fields.append({
-                'name': field_name,
-                'line': line_num,
-                'modifiers': modifiers,
-                'type': field_type
-            })
+        for match in _FIELD_RE.finditer(content):
+            fields.append(FieldInfo(
+                name=match.group('name'),
+                line=_line_of(match.start('name'), nlo),
+                modifiers=self._extract_modifiers(match.group('mods')),
+                type=match.group('type')))
         
         return fields
-    
-    def _extract_annotations(self, content: str) -> List[Dict]:
-        """提取注解"""
-        annotations = []
-        
-        # 注解模式
-        annotation_pattern = r'@(\w+)(?:\([^)]*\))?'
-        
-        matches = re.finditer(annotation_pattern, content, re.MULTILINE)
-        for match in matches:
-            annotation_name = match.group(1)
-            line_num = content[:match.start()].count('\n') + 1
-            
-            annotations.append({
-                'name': annotation_name,
-                'line': line_num,
-                'full_match': match.group(0)
-            })
-        
-        return annotations
-    
-    def _extract_method_calls(self, content: str) -> List[Dict]:
+
+    def _extract_method_calls(self, content: str, nlo: List[int]) -> List[CallInfo]:
         """提取方法调用"""
         calls = []
         
-        # 方法调用模式
-        call_patterns = [
-            r'(\w+)\s*\.\s*(\w+)\s*\(',  # object.method()
-            r'(\w+)\s*\(',  # method()
-            r'new\s+([a-zA-Z_][a-zA-Z0-9_.]*)\s*\(',  # new Class()
-            r'super\s*\(',  # super()
-            r'this\s*\(',  # this()
-        ]
-        
-        for pattern in call_patterns:
-            matches = re.finditer(pattern, content, re.MULTILINE)
-            for match in matches:
-                line_num = content[:match.start()].count('\n') + 1
-                
-                if len(match.groups()) == 2:
-                    # object.method() 模式
-                    calls.append({
-                        'object': match.group(1),
-                        'method': match.group(2),
-                        'line': line_num,
-                        'type': 'instance_call'
-                    })
-                elif len(match.groups()) == 1:
-                    # method() 或 new Class() 模式
-                    method_name = match.group(1)
-                    if method_name in ['super', 'this']:
-                        calls.append({
-                            'method': method_name,
-                            'line': line_num,
-                            'type': 'constructor_call'
-                        })
-                    elif method_name == 'new':
-                        # 这是new Class()模式
-                        continue
-                    else:
-                        calls.append({
-                            'method': method_name,
-                            'line': line_num,
-                            'type': 'direct_call'
-                        })
+        for match in _CALL_RE.finditer(content):
+            line_num = _line_of(match.start(), nlo)
+            
+            if match.group('ic_obj') is not None:
+                # object.method() 模式
+                calls.append(CallInfo(
+                    method=match.group('ic_meth'),
+                    line=line_num,
+                    type='instance_call',
+                    object=match.group('ic_obj')))
+            elif match.group('ctor') is not None:
+                # new Class() 模式
+                calls.append(CallInfo(
+                    method=match.group('ctor'),
+                    line=line_num,
+                    type='constructor_call'))
+            else:
+                method_name = match.group('direct')
+                call_type = 'constructor_call' if method_name in ('super', 'this') else 'direct_call'
+                calls.append(CallInfo(
+                    method=method_name,
+                    line=line_num,
+                    type=call_type))
         
         return calls
-    
+
     def _detect_modern_features(self, content: str) -> List[str]:
         """检测现代Java特性"""
         features = []
         
-        # 检测各种现代特性
-        modern_patterns = {
-            'record': r'record\s+\w+',
-            'sealed': r'sealed\s+(?:class|interface)',
-            'permits': r'permits\s+',
-            'switch_expression': r'switch\s*\([^)]+\)\s*\{[^}]*\}',
-            'var': r'var\s+\w+\s*=',
-            'text_blocks': r'"""',
-            'pattern_matching': r'instanceof\s+\w+\s+\w+',
-            'yield': r'yield\s+',
-        }
-        
-        for feature, pattern in modern_patterns.items():
-            if re.search(pattern, content, re.MULTILINE):
-                features.append(feature)
+        # 纯字面量特性用 str 的 C 级子串查找即可，无需正则引擎
+        if 'record ' in content:
+            features.append('record')
+        if 'sealed class' in content or 'sealed interface' in content:
+            features.append('sealed')
+        if 'permits ' in content:
+            features.append('permits')
+        # 需要上下文的特性：廉价子串预筛命中后才运行已编译正则
+        if 'switch' in content and _SWITCH_EXPR_RE.search(content):
+            features.append('switch_expression')
+        if 'var ' in content and _VAR_RE.search(content):
+            features.append('var')
+        if '"""' in content:
+            features.append('text_blocks')
+        if 'instanceof ' in content and _INSTANCEOF_PATTERN_RE.search(content):
+            features.append('pattern_matching')
+        if 'yield ' in content:
+            features.append('yield')
         
         return features
-    
-    def _calculate_complexity_metrics(self, content: str, lines: List[str]) -> Dict:
-        """计算复杂度指标"""
+
+    def _calculate_complexity_metrics(self, content: str, line_count: int,
+                                      method_count: int, class_count: int) -> Dict:
+        """计算复杂度指标（行数与方法/类计数由 _parse_content 传入，不再重扫）"""
         # 基本指标
-        line_count = len(lines)
         char_count = len(content)
         
-        # 控制结构计数
-        control_structures = sum(1 for line in lines if any(cs in line for cs in self.control_structures))
-        
-        # 方法数量
-        method_count = len(self._extract_methods(content, lines))
-        
-        # 类数量
-        class_count = len(self._extract_classes(content, lines))
+        # 控制结构计数：单遍整词正则替代 每行×11 关键字 的子串扫描，
+        # 顺带修掉 if 误命中 identifier 这类子串假阳性
+        control_structures = sum(1 for _ in _CONTROL_RE.finditer(content))
         
         # 圈复杂度估算（简化版）
         cyclomatic_complexity = control_structures + 1
@@ -337,15 +575,13 @@ class JavaASTParser:
             'control_structures': control_structures,
             'cyclomatic_complexity': cyclomatic_complexity
         }
-    
+
     def _extract_modifiers(self, text: str) -> List[str]:
-        """提取修饰符"""
-        modifiers = []
-        for modifier in self.access_modifiers | self.method_keywords:
-            if modifier in text:
-                modifiers.append(modifier)
-        return modifiers
-    
+        """提取修饰符：按空白切词后与修饰符集合取交集。
+        逐个子串查找既是 13×O(len) 的开销，也会让 'finalized'
+        之类的标识符误命中 'final'；整词匹配两个问题都没有。"""
+        return list(_MODIFIER_SET.intersection(text.split()))
+
     def _get_class_type(self, text: str) -> str:
         """获取类类型"""
         if 'record' in text:
@@ -360,30 +596,14 @@ class JavaASTParser:
             return 'sealed'
         else:
             return 'class'
-    
-    def _extract_method_parameters(self, text: str) -> List[str]:
-        """提取方法参数"""
-        # 简化版参数提取
-        param_pattern = r'\(([^)]*)\)'
-        match = re.search(param_pattern, text)
-        if match and match.group(1).strip():
-            return [param.strip() for param in match.group(1).split(',')]
-        return []
-    
-    def _extract_return_type(self, text: str) -> Optional[str]:
-        """提取返回类型"""
-        # 简化版返回类型提取
-        type_pattern = r'(?:public|private|protected|package-private)?\s*(?:static|final|abstract|synchronized|native|strictfp|default)?\s*(?:<[^>]*>)?\s*(void|\w+(?:<[^>]*>)?(?:\s*\[\])*)\s+\w+\s*\('
-        match = re.search(type_pattern, text)
-        return match.group(1) if match else None
-    
-    def _extract_field_type(self, text: str) -> Optional[str]:
-        """提取字段类型"""
-        # 简化版字段类型提取
-        type_pattern = r'(?:public|private|protected|package-private)?\s*(?:static|final|transient|volatile)?\s*(?:<[^>]*>)?\s*(void|\w+(?:<[^>]*>)?(?:\s*\[\])*)\s+\w+\s*'
-        match = re.search(type_pattern, text)
-        return match.group(1) if match else None
-    
+
+    def _split_parameters(self, params_text: str) -> List[str]:
+        """切分参数列表（来自签名正则的 params 捕获组）"""
+        params_text = params_text.strip()
+        if not params_text:
+            return []
+        return [param.strip() for param in params_text.split(',')]
+
     def _create_empty_result(self) -> Dict:
         """创建空结果"""
         return {
@@ -401,12 +621,70 @@ class JavaASTParser:
         }
 
 
+
+
+# 解析结果缓存：解析是文件内容的纯函数，以 (mtime_ns, size) 为新鲜度
+# 判据。进程内用 dict 直取；跨进程/跨运行经磁盘 pickle 复用，
+# 目录可用 AST_PARSE_CACHE 环境变量重定向
+try:
+    _CACHE_DIR: Optional[Path] = Path(
+        os.environ.get('AST_PARSE_CACHE',
+                       os.path.join('~', '.cache', 'ast_parse'))).expanduser()
+    _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+except OSError:
+    _CACHE_DIR = None
+
+_MEM_CACHE: Dict[str, tuple] = {}
+
+
+def _cached_parse(filepath: str, parse: Callable[[str], Dict]) -> Dict:
+    """带两级缓存的解析入口；stat 失败时退化为直接解析"""
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return parse(filepath)
+    stamp = (st.st_mtime_ns, st.st_size)
+    
+    cached = _MEM_CACHE.get(filepath)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    
+    cache_path = None
+    if _CACHE_DIR is not None:
+        key = hashlib.sha1(
+            f"{os.path.abspath(filepath)}:{stamp[0]}:{stamp[1]}".encode()).hexdigest()
+        cache_path = _CACHE_DIR / key[:2] / key
+        if cache_path.exists():
+            try:
+                result = pickle.loads(cache_path.read_bytes())
+                _MEM_CACHE[filepath] = (stamp, result)
+                return result
+            except Exception:
+                pass  # 缓存损坏则重新解析
+    
+    result = parse(filepath)
+    _MEM_CACHE[filepath] = (stamp, result)
+    if cache_path is not None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(pickle.dumps(result))
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass
+    return result
+
+
 # 工厂函数
 def create_java_parser() -> JavaASTParser:
     """创建Java AST解析器实例"""
     return JavaASTParser()
 
 
+# 模块级入口复用同一实例：解析器无状态，无需每文件新建
+_SHARED_PARSER = JavaASTParser()
+
+
 # 便捷函数
 def parse_java_file(filepath: str) -> Dict:
     """
@@ -416,10 +694,26 @@ def parse_java_file(filepath: str) -> Dict:
         filepath: Java文件路径
         
     Returns:
-        包含解析结果的字典
+        包含解析结果的字典（结果按 (mtime_ns, size) 缓存）
+    """
+    return _cached_parse(filepath, _SHARED_PARSER.parse_file)
+
+
+def parse_files(filepaths: List[str], processes: Optional[int] = None) -> List[Dict]:
+    """
+    批量解析Java文件（按文件并行，解析间无共享状态）
+    
+    Args:
+        filepaths: Java文件路径列表
+        processes: 进程数，默认取 CPU 核数
+        
+    Returns:
+        与输入同序的解析结果列表
     """
-    parser = create_java_parser()
-    return parser.parse_file(filepath)
+    filepaths = list(filepaths)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        # chunksize 批量派发，摊薄进程间通信开销
+        return list(executor.map(parse_java_file, filepaths, chunksize=16))
 
 
 if __name__ == "__main__":
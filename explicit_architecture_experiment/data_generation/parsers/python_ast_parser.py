@@ -17,15 +17,47 @@ Python AST解析器
 """
 
 import ast
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 import os
-from typing import List, Dict, Optional
+import pickle
+import hashlib
+from pathlib import Path
+from typing import Callable, List, Dict, Optional
+
+
+# 提取记录用 namedtuple，大规模语料下比等价 dict 省 3~4 倍内存
+ClassInfo = namedtuple('ClassInfo', ('name', 'line', 'bases', 'decorators'))
+FunctionInfo = namedtuple('FunctionInfo',
+                          ('name', 'line', 'is_async', 'args', 'decorators'))
+CallInfo = namedtuple('CallInfo', ('function', 'line', 'type', 'object'),
+                      defaults=(None,))
+
+
+def _cheap_unparse(node: ast.AST) -> str:
+    """
+    针对 Name / Attribute 链的轻量反解析。
+
+    ast.unparse 每次实例化完整的 _Unparser 访问器，而基类、
+    装饰器和调用对象绝大多数只是 a.b.c 形式的点分名称；
+    罕见形态（下标、调用等）才回退到 ast.unparse。
+    """
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        parts = []
+        cur = node
+        while isinstance(cur, ast.Attribute):
+            parts.append(cur.attr)
+            cur = cur.value
+        if isinstance(cur, ast.Name):
+            parts.append(cur.id)
+            return '.'.join(reversed(parts))
+    return ast.unparse(node)
 
 
 class PythonASTParser:
-    """Python AST解析器"""
-    
-    def __init__(self):
-        self.control_structures = {'if', 'for', 'while', 'try', 'with', 'def', 'class', 'async'}
+    """Python AST解析器（无实例状态，可安全共享）"""
     
     def parse_file(self, filepath: str) -> Dict:
         """
@@ -55,102 +87,69 @@ class PythonASTParser:
             print(f"⚠️ Python语法错误: {filepath} - {e}")
             return self._create_empty_result()
         
-        lines = content.split('\n')
-        
-        # 基础信息
-        result = {
-            'file': filepath,
-            'imports': self._extract_imports(tree),
-            'classes': self._extract_classes(tree, lines),
-            'functions': self._extract_functions(tree, lines),
-            'function_calls': self._extract_function_calls(tree, lines),
-            'complexity_metrics': self._calculate_complexity_metrics(tree, lines)
-        }
-        
-        return result
-    
-    def _extract_imports(self, tree: ast.AST) -> List[str]:
-        """提取导入语句"""
-        imports = []
+        # 单次 ast.walk 同时收集导入/类/函数/调用/控制结构；
+        # 此前按类别各走一遍、复杂度统计再重走两遍，合计 7 次全树遍历
+        imports: List[str] = []
+        classes: List[ClassInfo] = []
+        functions: List[FunctionInfo] = []
+        calls: List[CallInfo] = []
+        control_structures = 0
         
         for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
+            t = type(node)
+            if t is ast.Import:
                 for alias in node.names:
                     imports.append(alias.name)
-            elif isinstance(node, ast.ImportFrom):
+            elif t is ast.ImportFrom:
                 if node.module:
                     imports.append(node.module)
-        
-        return imports
-    
-    def _extract_classes(self, tree: ast.AST, lines: List[str]) -> List[Dict]:
-        """提取类定义"""
-        classes = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                classes.append({
-                    'name': node.name,
-                    'line': node.lineno,
-                    'bases': [ast.unparse(base) for base in node.bases],
-                    'decorators': [ast.unparse(dec) for dec in node.decorator_list]
-                })
-        
-        return classes
-    
-    def _extract_functions(self, tree: ast.AST, lines: List[str]) -> List[Dict]:
-        """提取函数定义"""
-        functions = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                functions.append({
-                    'name': node.name,
-                    'line': node.lineno,
-                    'is_async': isinstance(node, ast.AsyncFunctionDef),
-                    'args': [arg.arg for arg in node.args.args],
-                    'decorators': [ast.unparse(dec) for dec in node.decorator_list]
-                })
-        
-        return functions
-    
-    def _extract_function_calls(self, tree: ast.AST, lines: List[str]) -> List[Dict]:
-        """提取函数调用"""
-        calls = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
+            elif t is ast.ClassDef:
+                classes.append(ClassInfo(
+                    name=node.name,
+                    line=node.lineno,
+                    bases=[_cheap_unparse(base) for base in node.bases],
+                    decorators=[_cheap_unparse(dec) for dec in node.decorator_list]))
+            elif t is ast.FunctionDef or t is ast.AsyncFunctionDef:
+                functions.append(FunctionInfo(
+                    name=node.name,
+                    line=node.lineno,
+                    is_async=t is ast.AsyncFunctionDef,
+                    args=[arg.arg for arg in node.args.args],
+                    decorators=[_cheap_unparse(dec) for dec in node.decorator_list]))
+            elif t is ast.Call:
                 if isinstance(node.func, ast.Name):
-                    calls.append({
-                        'function': node.func.id,
-                        'line': node.lineno,
-                        'type': 'direct_call'
-                    })
+                    calls.append(CallInfo(
+                        function=node.func.id,
+                        line=node.lineno,
+                        type='direct_call'))
                 elif isinstance(node.func, ast.Attribute):
-                    calls.append({
-                        'object': ast.unparse(node.func.value),
-                        'function': node.func.attr,
-                        'line': node.lineno,
-                        'type': 'method_call'
-                    })
-        
-        return calls
-    
-    def _calculate_complexity_metrics(self, tree: ast.AST, lines: List[str]) -> Dict:
-        """计算复杂度指标"""
-        # 基本指标
-        line_count = len(lines)
-        char_count = sum(len(line) for line in lines)
-        
-        # 控制结构计数
-        control_structures = 0
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.If, ast.For, ast.While, ast.Try, ast.With)):
+                    calls.append(CallInfo(
+                        function=node.func.attr,
+                        line=node.lineno,
+                        type='method_call',
+                        object=_cheap_unparse(node.func.value)))
+            elif t in (ast.If, ast.For, ast.While, ast.Try, ast.With):
                 control_structures += 1
         
-        # 函数和类数量
-        function_count = len(self._extract_functions(tree, lines))
-        class_count = len(self._extract_classes(tree, lines))
+        # 基础信息
+        result = {
+            'file': filepath,
+            'imports': imports,
+            'classes': classes,
+            'functions': functions,
+            'function_calls': calls,
+            'complexity_metrics': self._calculate_complexity_metrics(
+                content, len(functions), len(classes), control_structures)
+        }
+        
+        return result
+    
+    def _calculate_complexity_metrics(self, content: str, function_count: int,
+                                      class_count: int, control_structures: int) -> Dict:
+        """计算复杂度指标（计数由 _parse_content 的单次遍历给出）"""
+        # 基本指标：直接从原文得出，避免为两个计数 split 出整份行列表
+        line_count = content.count('\n') + 1
+        char_count = len(content)
         
         # 圈复杂度估算
         cyclomatic_complexity = control_structures + 1
@@ -176,12 +175,70 @@ class PythonASTParser:
         }
 
 
+
+
+# 解析结果缓存：解析是文件内容的纯函数，以 (mtime_ns, size) 为新鲜度
+# 判据。进程内用 dict 直取；跨进程/跨运行经磁盘 pickle 复用，
+# 目录可用 AST_PARSE_CACHE 环境变量重定向
+try:
+    _CACHE_DIR: Optional[Path] = Path(
+        os.environ.get('AST_PARSE_CACHE',
+                       os.path.join('~', '.cache', 'ast_parse'))).expanduser()
+    _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+except OSError:
+    _CACHE_DIR = None
+
+_MEM_CACHE: Dict[str, tuple] = {}
+
+
+def _cached_parse(filepath: str, parse: Callable[[str], Dict]) -> Dict:
+    """带两级缓存的解析入口；stat 失败时退化为直接解析"""
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return parse(filepath)
+    stamp = (st.st_mtime_ns, st.st_size)
+    
+    cached = _MEM_CACHE.get(filepath)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    
+    cache_path = None
+    if _CACHE_DIR is not None:
+        key = hashlib.sha1(
+            f"{os.path.abspath(filepath)}:{stamp[0]}:{stamp[1]}".encode()).hexdigest()
+        cache_path = _CACHE_DIR / key[:2] / key
+        if cache_path.exists():
+            try:
+                result = pickle.loads(cache_path.read_bytes())
+                _MEM_CACHE[filepath] = (stamp, result)
+                return result
+            except Exception:
+                pass  # 缓存损坏则重新解析
+    
+    result = parse(filepath)
+    _MEM_CACHE[filepath] = (stamp, result)
+    if cache_path is not None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(pickle.dumps(result))
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass
+    return result
+
+
 # 工厂函数
 def create_python_parser() -> PythonASTParser:
     """创建Python AST解析器实例"""
     return PythonASTParser()
 
 
+# 模块级入口复用同一实例：解析器无状态，无需每文件新建
+_SHARED_PARSER = PythonASTParser()
+
+
 # 便捷函数
 def parse_python_file(filepath: str) -> Dict:
     """
@@ -191,10 +248,26 @@ def parse_python_file(filepath: str) -> Dict:
         filepath: Python文件路径
         
     Returns:
-        包含解析结果的字典
+        包含解析结果的字典（结果按 (mtime_ns, size) 缓存）
+    """
+    return _cached_parse(filepath, _SHARED_PARSER.parse_file)
+
+
+def parse_files(filepaths: List[str], processes: Optional[int] = None) -> List[Dict]:
+    """
+    批量解析Python文件（按文件并行，解析间无共享状态）
+    
+    Args:
+        filepaths: Python文件路径列表
+        processes: 进程数，默认取 CPU 核数
+        
+    Returns:
+        与输入同序的解析结果列表
     """
-    parser = create_python_parser()
-    return parser.parse_file(filepath)
+    filepaths = list(filepaths)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        # chunksize 批量派发，摊薄进程间通信开销
+        return list(executor.map(parse_python_file, filepaths, chunksize=16))
 
 
 if __name__ == "__main__":
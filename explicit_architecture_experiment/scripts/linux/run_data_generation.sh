@@ -42,7 +42,7 @@ python ../../data_generation/coupling_analyzer.py \
 
 echo "✅ 数据生成完成!"
 echo "📊 输出文件:"
-echo "   - 显性架构样本: $OUTPUT_DIR/explicit_samples.json"
-echo "   - 非显性架构样本: $OUTPUT_DIR/non_explicit_samples.json"
+echo "   - 显性架构样本: $OUTPUT_DIR/explicit_samples.jsonl"
+echo "   - 非显性架构样本: $OUTPUT_DIR/non_explicit_samples.jsonl"
 echo "   - 耦合度报告: $OUTPUT_DIR/coupling_report.csv"
 echo "   - 耦合度对比图: $OUTPUT_DIR/coupling_comparison.png"
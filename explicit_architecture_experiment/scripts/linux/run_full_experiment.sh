@@ -28,8 +28,8 @@ echo "📊 步骤 1: 数据生成..."
 # 2. 模型训练
 echo "🤖 步骤 2: 模型训练..."
 ./run_training.sh \
-    "$OUTPUT_DIR/dataset/explicit_samples.json" \
-    "$OUTPUT_DIR/dataset/non_explicit_samples.json" \
+    "$OUTPUT_DIR/dataset/explicit_samples.jsonl" \
+    "$OUTPUT_DIR/dataset/non_explicit_samples.jsonl" \
     "gpt2" \
     "$OUTPUT_DIR/models"
 
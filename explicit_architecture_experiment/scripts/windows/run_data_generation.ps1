@@ -43,8 +43,8 @@ try {
     
     Write-Host "✅ 数据生成完成!" -ForegroundColor Green
     Write-Host "📊 输出文件:" -ForegroundColor Cyan
-    Write-Host "   - 显性架构样本: $OutputDir\explicit_samples.json" -ForegroundColor White
-    Write-Host "   - 非显性架构样本: $OutputDir\non_explicit_samples.json" -ForegroundColor White
+    Write-Host "   - 显性架构样本: $OutputDir\explicit_samples.jsonl" -ForegroundColor White
+    Write-Host "   - 非显性架构样本: $OutputDir\non_explicit_samples.jsonl" -ForegroundColor White
     Write-Host "   - 耦合度报告: $OutputDir\coupling_report.csv" -ForegroundColor White
     Write-Host "   - 耦合度对比图: $OutputDir\coupling_comparison.png" -ForegroundColor White
     
@@ -33,7 +33,7 @@ if %ERRORLEVEL% neq 0 (
 
 REM 2. 模型训练
 echo 🤖 步骤 2: 模型训练...
-call run_training.bat "%OUTPUT_DIR%\dataset\explicit_samples.json" "%OUTPUT_DIR%\dataset\non_explicit_samples.json" "gpt2" "%OUTPUT_DIR%\models"
+call run_training.bat "%OUTPUT_DIR%\dataset\explicit_samples.jsonl" "%OUTPUT_DIR%\dataset\non_explicit_samples.jsonl" "gpt2" "%OUTPUT_DIR%\models"
 
 if %ERRORLEVEL% neq 0 (
     echo ❌ 模型训练失败
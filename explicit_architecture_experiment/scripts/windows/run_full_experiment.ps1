@@ -29,7 +29,7 @@ try {
     
     # 2. 模型训练
     Write-Host "🤖 步骤 2: 模型训练..." -ForegroundColor Yellow
-    & ".\run_training.ps1" -ExplicitData "$OutputDir\dataset\explicit_samples.json" -ImplicitData "$OutputDir\dataset\non_explicit_samples.json" -ModelName "gpt2" -OutputDir "$OutputDir\models"
+    & ".\run_training.ps1" -ExplicitData "$OutputDir\dataset\explicit_samples.jsonl" -ImplicitData "$OutputDir\dataset\non_explicit_samples.jsonl" -ModelName "gpt2" -OutputDir "$OutputDir\models"
     
     if ($LASTEXITCODE -ne 0) {
         throw "模型训练失败"
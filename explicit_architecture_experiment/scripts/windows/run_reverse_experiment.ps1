@@ -47,7 +47,7 @@ try {
     
     # 训练MVC模型
     Write-Host "🔧 训练MVC架构模型..." -ForegroundColor Yellow
-    & ".\run_training.ps1" -ExplicitData "$OutputDir\mvc_dataset\explicit_samples.json" -ImplicitData "$OutputDir\mvc_dataset\non_explicit_samples.json" -ModelName "gpt2" -OutputDir "$OutputDir\mvc_models"
+    & ".\run_training.ps1" -ExplicitData "$OutputDir\mvc_dataset\explicit_samples.jsonl" -ImplicitData "$OutputDir\mvc_dataset\non_explicit_samples.jsonl" -ModelName "gpt2" -OutputDir "$OutputDir\mvc_models"
     
     if ($LASTEXITCODE -ne 0) {
         throw "MVC模型训练失败"
@@ -55,7 +55,7 @@ try {
     
     # 训练显性架构模型
     Write-Host "🔧 训练显性架构模型..." -ForegroundColor Yellow
-    & ".\run_training.ps1" -ExplicitData "$OutputDir\explicit_dataset\explicit_samples.json" -ImplicitData "$OutputDir\explicit_dataset\non_explicit_samples.json" -ModelName "gpt2" -OutputDir "$OutputDir\explicit_models"
+    & ".\run_training.ps1" -ExplicitData "$OutputDir\explicit_dataset\explicit_samples.jsonl" -ImplicitData "$OutputDir\explicit_dataset\non_explicit_samples.jsonl" -ModelName "gpt2" -OutputDir "$OutputDir\explicit_models"
     
     if ($LASTEXITCODE -ne 0) {
         throw "显性架构模型训练失败"
@@ -8,7 +8,7 @@ echo 🚀 开始显性架构实验模型训练...
 REM 检查参数
 if "%~3"=="" (
     echo 用法: %0 ^<explicit_data^> ^<implicit_data^> [model_name] [output_dir]
-    echo 示例: %0 .\dataset_out\explicit_samples.json .\dataset_out\non_explicit_samples.json gpt2 .\outputs
+    echo 示例: %0 .\dataset_out\explicit_samples.jsonl .\dataset_out\non_explicit_samples.jsonl gpt2 .\outputs
     exit /b 1
 )
 